@@ -1,876 +1,415 @@
-# -*- coding: utf-8 -*-
-import os
-os.environ['PYTHONIOENCODING'] = 'utf-8'
-
-from flask import Flask, request, jsonify
-import easyocr
-from PIL import Image
-import cv2
-import numpy as np
-from werkzeug.utils import secure_filename
-import base64
-from io import BytesIO
-import sys
-
-app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['UPLOAD_FOLDER'] = 'uploads'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'}
-
-# Create uploads folder if it doesn't exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-
-# Suppress EasyOCR download progress output
-import warnings
-warnings.filterwarnings('ignore')
-
-print("Initializing EasyOCR reader... (downloading models on first run)")
-print("This may take a few minutes on first startup...")
-
-# Initialize EasyOCR reader (supports multiple languages)
-# Download models on first run
-try:
-    reader = easyocr.Reader(['en'], gpu=True, verbose=False)
-except Exception as e:
-    print(f"Warning: Could not initialize EasyOCR: {e}")
-    reader = None
-
-# HTML Template as a string
-HTML_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>OCR Text Extractor - AI Powered</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-            background: #0f0f23;
-            min-height: 100vh;
-            padding: 20px;
-            color: #fff;
-            position: relative;
-            overflow-x: hidden;
-        }
-
-        /* Animated background */
-        body::before {
-            content: '';
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: 
-                radial-gradient(circle at 20% 50%, rgba(120, 119, 198, 0.15) 0%, transparent 50%),
-                radial-gradient(circle at 80% 80%, rgba(138, 43, 226, 0.15) 0%, transparent 50%),
-                radial-gradient(circle at 40% 20%, rgba(72, 149, 239, 0.15) 0%, transparent 50%);
-            animation: float 20s ease-in-out infinite;
-            z-index: 0;
-        }
-
-        @keyframes float {
-            0%, 100% { transform: translateY(0) scale(1); }
-            50% { transform: translateY(-20px) scale(1.05); }
-        }
-
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-            position: relative;
-            z-index: 1;
-        }
-
-        .header {
-            text-align: center;
-            margin-bottom: 50px;
-            animation: fadeInDown 0.8s ease-out;
-        }
-
-        @keyframes fadeInDown {
-            from {
-                opacity: 0;
-                transform: translateY(-30px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-
-        .header h1 {
-            font-size: 3.5em;
-            margin-bottom: 15px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            font-weight: 800;
-            letter-spacing: -1px;
-        }
-
-        .header .subtitle {
-            font-size: 1.2em;
-            color: #a0a0c0;
-            font-weight: 300;
-        }
-
-        .header .tagline {
-            display: inline-block;
-            margin-top: 10px;
-            padding: 8px 20px;
-            background: rgba(102, 126, 234, 0.2);
-            border-radius: 20px;
-            font-size: 0.9em;
-            color: #8b9cff;
-            border: 1px solid rgba(102, 126, 234, 0.3);
-        }
-
-        .main-content {
-            background: rgba(25, 25, 45, 0.6);
-            backdrop-filter: blur(20px);
-            border-radius: 30px;
-            padding: 50px;
-            box-shadow: 0 30px 90px rgba(0, 0, 0, 0.5),
-                        0 0 0 1px rgba(255, 255, 255, 0.05);
-            border: 1px solid rgba(255, 255, 255, 0.05);
-            animation: fadeInUp 0.8s ease-out 0.2s both;
-        }
-
-        @keyframes fadeInUp {
-            from {
-                opacity: 0;
-                transform: translateY(30px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-
-        .upload-section {
-            text-align: center;
-            padding: 60px 40px;
-            border: 3px dashed rgba(102, 126, 234, 0.4);
-            border-radius: 20px;
-            background: rgba(102, 126, 234, 0.05);
-            transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-            cursor: pointer;
-            position: relative;
-            overflow: hidden;
-        }
-
-        .upload-section::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(102, 126, 234, 0.1), transparent);
-            transition: left 0.6s;
-        }
-
-        .upload-section:hover::before {
-            left: 100%;
-        }
-
-        .upload-section:hover {
-            border-color: #667eea;
-            background: rgba(102, 126, 234, 0.1);
-            transform: translateY(-5px);
-            box-shadow: 0 20px 40px rgba(102, 126, 234, 0.2);
-        }
-
-        .upload-section.dragover {
-            border-color: #f093fb;
-            background: rgba(240, 147, 251, 0.1);
-            transform: scale(1.02);
-        }
-
-        .upload-icon {
-            font-size: 5em;
-            margin-bottom: 20px;
-            animation: bounce 2s infinite;
-        }
-
-        @keyframes bounce {
-            0%, 100% { transform: translateY(0); }
-            50% { transform: translateY(-10px); }
-        }
-
-        .upload-section h2 {
-            color: #fff;
-            margin-bottom: 10px;
-            font-size: 1.8em;
-            font-weight: 600;
-        }
-
-        .upload-section p {
-            color: #a0a0c0;
-            margin-bottom: 30px;
-            font-size: 1.1em;
-        }
-
-        #fileInput {
-            display: none;
-        }
-
-        .btn {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border: none;
-            padding: 16px 40px;
-            border-radius: 30px;
-            font-size: 1.1em;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            font-weight: 600;
-            box-shadow: 0 10px 30px rgba(102, 126, 234, 0.3);
-            position: relative;
-            overflow: hidden;
-        }
-
-        .btn::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.2), transparent);
-            transition: left 0.5s;
-        }
-
-        .btn:hover::before {
-            left: 100%;
-        }
-
-        .btn:hover {
-            transform: translateY(-3px);
-            box-shadow: 0 15px 40px rgba(102, 126, 234, 0.5);
-        }
-
-        .btn:active {
-            transform: translateY(-1px);
-        }
-
-        .btn:disabled {
-            opacity: 0.5;
-            cursor: not-allowed;
-        }
-
-        .results-section {
-            display: none;
-            margin-top: 40px;
-            animation: fadeInUp 0.6s ease-out;
-        }
-
-        .results-header {
-            color: #fff;
-            margin-bottom: 30px;
-            font-size: 2em;
-            font-weight: 700;
-            text-align: center;
-        }
-
-        .results-grid {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 30px;
-            margin-top: 20px;
-        }
-
-        @media (max-width: 968px) {
-            .results-grid {
-                grid-template-columns: 1fr;
-            }
-            .header h1 {
-                font-size: 2.5em;
-            }
-            .main-content {
-                padding: 30px 20px;
-            }
-        }
-
-        .result-card {
-            background: rgba(35, 35, 60, 0.6);
-            backdrop-filter: blur(10px);
-            border-radius: 20px;
-            padding: 30px;
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.3);
-            border: 1px solid rgba(255, 255, 255, 0.05);
-            transition: all 0.3s ease;
-        }
-
-        .result-card:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 15px 40px rgba(0, 0, 0, 0.4);
-        }
-
-        .result-card h3 {
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            margin-bottom: 20px;
-            font-size: 1.5em;
-            font-weight: 700;
-        }
-
-        .image-container {
-            position: relative;
-            border-radius: 15px;
-            overflow: hidden;
-            margin-bottom: 20px;
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.3);
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }
-
-        .image-container:hover {
-            transform: scale(1.02);
-            box-shadow: 0 15px 40px rgba(102, 126, 234, 0.3);
-        }
-
-        .image-preview {
-            width: 100%;
-            display: block;
-            border-radius: 15px;
-        }
-
-        .image-overlay {
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: rgba(0, 0, 0, 0.7);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            opacity: 0;
-            transition: opacity 0.3s ease;
-            border-radius: 15px;
-        }
-
-        .image-container:hover .image-overlay {
-            opacity: 1;
-        }
-
-        .image-overlay span {
-            color: white;
-            font-size: 1.2em;
-            font-weight: 600;
-            padding: 10px 20px;
-            background: rgba(102, 126, 234, 0.8);
-            border-radius: 10px;
-        }
-
-        .extracted-text {
-            background: rgba(20, 20, 35, 0.8);
-            padding: 25px;
-            border-radius: 15px;
-            border-left: 4px solid #667eea;
-            white-space: pre-wrap;
-            word-wrap: break-word;
-            max-height: 400px;
-            overflow-y: auto;
-            font-family: 'Monaco', 'Courier New', monospace;
-            line-height: 1.8;
-            color: #e0e0f0;
-            font-size: 0.95em;
-        }
-
-        .extracted-text::-webkit-scrollbar {
-            width: 8px;
-        }
-
-        .extracted-text::-webkit-scrollbar-track {
-            background: rgba(0, 0, 0, 0.2);
-            border-radius: 10px;
-        }
-
-        .extracted-text::-webkit-scrollbar-thumb {
-            background: #667eea;
-            border-radius: 10px;
-        }
-
-        .stats {
-            display: flex;
-            gap: 15px;
-            margin-bottom: 20px;
-        }
-
-        .stat-item {
-            background: rgba(102, 126, 234, 0.1);
-            padding: 15px;
-            border-radius: 12px;
-            flex: 1;
-            text-align: center;
-            border: 1px solid rgba(102, 126, 234, 0.2);
-            transition: all 0.3s ease;
-        }
-
-        .stat-item:hover {
-            background: rgba(102, 126, 234, 0.15);
-            transform: translateY(-3px);
-        }
-
-        .stat-value {
-            font-size: 2em;
-            font-weight: 800;
-            background: linear-gradient(135deg, #667eea, #f093fb);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-        }
-
-        .stat-label {
-            font-size: 0.9em;
-            color: #a0a0c0;
-            margin-top: 5px;
-        }
-
-        .loading {
-            display: none;
-            text-align: center;
-            padding: 60px;
-        }
-
-        .spinner {
-            width: 60px;
-            height: 60px;
-            margin: 0 auto 30px;
-            position: relative;
-        }
-
-        .spinner::before,
-        .spinner::after {
-            content: '';
-            position: absolute;
-            border-radius: 50%;
-            animation: pulse 2s ease-in-out infinite;
-        }
-
-        .spinner::before {
-            width: 60px;
-            height: 60px;
-            border: 4px solid rgba(102, 126, 234, 0.3);
-            animation: spin 1s linear infinite;
-        }
-
-        .spinner::after {
-            width: 60px;
-            height: 60px;
-            border: 4px solid transparent;
-            border-top-color: #667eea;
-            border-right-color: #764ba2;
-            animation: spin 1s linear infinite;
-        }
-
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-
-        @keyframes pulse {
-            0%, 100% { opacity: 1; }
-            50% { opacity: 0.5; }
-        }
-
-        .loading p {
-            color: #a0a0c0;
-            font-size: 1.1em;
-        }
-
-        .error {
-            background: rgba(255, 59, 92, 0.2);
-            color: #ff6b9d;
-            padding: 20px;
-            border-radius: 15px;
-            margin-top: 20px;
-            display: none;
-            border: 1px solid rgba(255, 59, 92, 0.3);
-            animation: shake 0.5s;
-        }
-
-        @keyframes shake {
-            0%, 100% { transform: translateX(0); }
-            25% { transform: translateX(-10px); }
-            75% { transform: translateX(10px); }
-        }
-
-        .copy-btn {
-            background: linear-gradient(135deg, #11998e, #38ef7d);
-            color: white;
-            border: none;
-            padding: 12px 30px;
-            border-radius: 25px;
-            cursor: pointer;
-            font-size: 1em;
-            font-weight: 600;
-            margin-top: 15px;
-            box-shadow: 0 8px 20px rgba(56, 239, 125, 0.3);
-            transition: all 0.3s ease;
-        }
-
-        .copy-btn:hover {
-            transform: translateY(-3px);
-            box-shadow: 0 12px 30px rgba(56, 239, 125, 0.4);
-        }
-
-        .copy-btn:active {
-            transform: translateY(-1px);
-        }
-
-        /* Modal for full image view */
-        .modal {
-            display: none;
-            position: fixed;
-            z-index: 1000;
-            left: 0;
-            top: 0;
-            width: 100%;
-            height: 100%;
-            background-color: rgba(0, 0, 0, 0.95);
-            animation: fadeIn 0.3s;
-        }
-
-        @keyframes fadeIn {
-            from { opacity: 0; }
-            to { opacity: 1; }
-        }
-
-        .modal-content {
-            margin: auto;
-            display: block;
-            max-width: 90%;
-            max-height: 90%;
-            position: absolute;
-            top: 50%;
-            left: 50%;
-            transform: translate(-50%, -50%);
-            border-radius: 10px;
-            box-shadow: 0 20px 60px rgba(0, 0, 0, 0.5);
-        }
-
-        .close-modal {
-            position: absolute;
-            top: 30px;
-            right: 50px;
-            color: #fff;
-            font-size: 40px;
-            font-weight: bold;
-            cursor: pointer;
-            z-index: 1001;
-            transition: all 0.3s ease;
-        }
-
-        .close-modal:hover {
-            color: #667eea;
-            transform: rotate(90deg);
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>✨ OCR Text Extractor</h1>
-            <p class="subtitle">EasyOCR-Powered Document Text Recognition</p>
-            <div class="tagline">🚀 Extract text from any image instantly</div>
-        </div>
-
-        <div class="main-content">
-            <div class="upload-section" id="uploadSection">
-                <div class="upload-icon">📸</div>
-                <h2>Upload Your Document</h2>
-                <p>Drag and drop an image here or click to browse</p>
-                <input type="file" id="fileInput" accept="image/*">
-                <button class="btn" onclick="document.getElementById('fileInput').click()">
-                    Choose File
-                </button>
-            </div>
-
-            <div class="loading" id="loading">
-                <div class="spinner"></div>
-                <p>🔍 Processing image with EasyOCR...</p>
-            </div>
-
-            <div class="error" id="error"></div>
-
-            <div class="results-section" id="results">
-                <h2 class="results-header">✅ Extraction Results</h2>
-                <div class="results-grid">
-                    <div class="result-card">
-                        <h3>📷 Original Image</h3>
-                        <div class="image-container" onclick="openModal()">
-                            <img id="previewImage" class="image-preview" alt="Uploaded image">
-                            <div class="image-overlay">
-                                <span>🔍 Click to view full size</span>
-                            </div>
-                        </div>
-                        <div class="stats">
-                            <div class="stat-item">
-                                <div class="stat-value" id="detections">0</div>
-                                <div class="stat-label">Text Detections</div>
-                            </div>
-                            <div class="stat-item">
-                                <div class="stat-value" id="charCount">0</div>
-                                <div class="stat-label">Characters</div>
-                            </div>
-                            <div class="stat-item">
-                                <div class="stat-value" id="confidence">0%</div>
-                                <div class="stat-label">Avg Confidence</div>
-                            </div>
-                        </div>
-                    </div>
-                    <div class="result-card">
-                        <h3>📝 Extracted Text</h3>
-                        <div class="extracted-text" id="extractedText"></div>
-                        <button class="copy-btn" onclick="copyText()">📋 Copy Text</button>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Modal for full image view -->
-    <div id="imageModal" class="modal" onclick="closeModal()">
-        <span class="close-modal">&times;</span>
-        <img class="modal-content" id="modalImage">
-    </div>
-
-    <script>
-        const uploadSection = document.getElementById('uploadSection');
-        const fileInput = document.getElementById('fileInput');
-        const loading = document.getElementById('loading');
-        const results = document.getElementById('results');
-        const error = document.getElementById('error');
-        let currentImageData = '';
-
-        uploadSection.addEventListener('dragover', (e) => {
-            e.preventDefault();
-            uploadSection.classList.add('dragover');
-        });
-
-        uploadSection.addEventListener('dragleave', () => {
-            uploadSection.classList.remove('dragover');
-        });
-
-        uploadSection.addEventListener('drop', (e) => {
-            e.preventDefault();
-            uploadSection.classList.remove('dragover');
-            const files = e.dataTransfer.files;
-            if (files.length > 0) {
-                handleFile(files[0]);
-            }
-        });
-
-        fileInput.addEventListener('change', (e) => {
-            if (e.target.files.length > 0) {
-                handleFile(e.target.files[0]);
-            }
-        });
-
-        function handleFile(file) {
-            if (!file.type.startsWith('image/')) {
-                showError('Please upload a valid image file');
-                return;
-            }
-
-            const formData = new FormData();
-            formData.append('file', file);
-
-            uploadSection.style.display = 'none';
-            loading.style.display = 'block';
-            results.style.display = 'none';
-            error.style.display = 'none';
-
-            fetch('/upload', {
-                method: 'POST',
-                body: formData
-            })
-            .then(response => response.json())
-            .then(data => {
-                loading.style.display = 'none';
-                
-                if (data.success) {
-                    displayResults(data);
-                } else {
-                    showError(data.error || 'An error occurred during processing');
-                }
-            })
-            .catch(err => {
-                loading.style.display = 'none';
-                showError('Failed to process image: ' + err.message);
-            });
-        }
-
-        function displayResults(data) {
-            currentImageData = 'data:image/jpeg;base64,' + data.image;
-            document.getElementById('previewImage').src = currentImageData;
-            document.getElementById('extractedText').textContent = data.text || 'No text detected';
-            document.getElementById('detections').textContent = data.detections || 0;
-            document.getElementById('charCount').textContent = data.char_count || 0;
-            document.getElementById('confidence').textContent = (data.confidence || 0) + '%';
-            
-            results.style.display = 'block';
-            uploadSection.style.display = 'block';
-        }
-
-        function showError(message) {
-            error.textContent = '❌ ' + message;
-            error.style.display = 'block';
-            uploadSection.style.display = 'block';
-        }
-
-        function copyText() {
-            const text = document.getElementById('extractedText').textContent;
-            navigator.clipboard.writeText(text).then(() => {
-                const btn = event.target;
-                const originalText = btn.textContent;
-                btn.textContent = '✅ Copied!';
-                setTimeout(() => {
-                    btn.textContent = originalText;
-                }, 2000);
-            });
-        }
-
-        function openModal() {
-            const modal = document.getElementById('imageModal');
-            const modalImg = document.getElementById('modalImage');
-            modal.style.display = 'block';
-            modalImg.src = currentImageData;
-        }
-
-        function closeModal() {
-            document.getElementById('imageModal').style.display = 'none';
-        }
-
-        // Close modal with Escape key
-        document.addEventListener('keydown', (e) => {
-            if (e.key === 'Escape') {
-                closeModal();
-            }
-        });
-    </script>
-</body>
-</html>
-"""
-
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
-def extract_text_easyocr(image_path):
-    """Extract text from image using EasyOCR"""
-    try:
-        # Read image
-        image = cv2.imread(image_path)
-        if image is None:
-            return {
-                'text': '',
-                'error': 'Failed to read image file',
-                'success': False
-            }
-        
-        # Run OCR
-        results = reader.readtext(image_path)
-        
-        if not results:
-            return {
-                'text': '',
-                'detections': 0,
-                'confidence': 0,
-                'char_count': 0,
-                'success': True
-            }
-        
-        # Extract text and confidence scores
-        extracted_text = ""
-        confidences = []
-        
-        for detection in results:
-            text = detection[1]
-            confidence = detection[2]
-            
-            extracted_text += text + "\n"
-            confidences.append(confidence * 100)  # Convert to percentage
-        
-        # Calculate average confidence
-        avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-        char_count = len(extracted_text.replace('\n', ''))
-        
-        return {
-            'text': extracted_text.strip(),
-            'detections': len(results),
-            'confidence': round(avg_confidence, 2),
-            'char_count': char_count,
-            'success': True
-        }
-    
-    except Exception as e:
-        return {
-            'text': '',
-            'error': f'OCR Error: {str(e)}',
-            'success': False
-        }
-
-@app.route('/')
-def index():
-    return HTML_TEMPLATE
-
-@app.route('/upload', methods=['POST'])
-def upload_file():
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file uploaded'}), 400
-    
-    file = request.files['file']
-    
-    if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
-    
-    if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
-        result = extract_text_easyocr(filepath)
-        
-        with open(filepath, 'rb') as img_file:
-            img_base64 = base64.b64encode(img_file.read()).decode('utf-8')
-        
-        os.remove(filepath)
-        
-        if result['success']:
-            return jsonify({
-                'text': result['text'],
-                'detections': result.get('detections', 0),
-                'confidence': result.get('confidence', 0),
-                'char_count': result.get('char_count', 0),
-                'image': img_base64,
-                'success': True
-            })
-        else:
-            return jsonify({'error': result['error'], 'success': False}), 500
-    
-    return jsonify({'error': 'Invalid file type'}), 400
-
-if __name__ == '__main__':
-    print("=" * 50)
-    print("OCR Text Extractor Server Starting...")
-    print("Using EasyOCR")
-    print("=" * 50)
-    print("Server running at: http://127.0.0.1:5000")
-    print("Or access via: http://localhost:5000")
-    print("=" * 50)
-    print("Press CTRL+C to stop the server")
-    print("=" * 50)
-    app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=True)
\ No newline at end of file
+# -*- coding: utf-8 -*-
+import os
+os.environ['PYTHONIOENCODING'] = 'utf-8'
+
+import cv2
+import numpy as np
+import threading
+import time
+import re
+from collections import OrderedDict
+from contextlib import contextmanager
+from ocr_cache import get_cache, make_key
+import metrics
+
+config = {
+    'EASYOCR_DEVICE': 'auto',  # 'cpu', 'gpu', or 'auto' to use CUDA when available
+    'EASYOCR_WARMUP': False,  # run a dummy inference at startup
+    'EASYOCR_LANGUAGES': ['en'],  # default language set, overridable per request
+    'EASYOCR_MAX_SIDE': None,  # e.g. 2560 to downscale large photos before detection
+    'EASYOCR_BATCH_SIZE': 8,  # recognizer batch size for batch uploads
+    'EASYOCR_POOL_MAX_READERS': 4,  # idle readers beyond this are evicted, least recently used first
+    'EASYOCR_POOL_MAX_BYTES': 512 * 1024 * 1024,  # memory budget for recognizer weights
+    'EASYOCR_STREAM_CHUNK': 4,  # text boxes recognised between progress events when streaming
+}
+
+# Suppress EasyOCR download progress output
+import warnings
+warnings.filterwarnings('ignore')
+
+# EasyOCR readers (one per language set) are built on first use by the ReaderPool
+READER_INFO = {'device': None, 'warmup_seconds': None}
+
+_reader_pool = None
+_reader_pool_lock = threading.Lock()
+
+def downscale_to_max_side(image, max_side):
+    """Shrink image so its longest side is at most max_side, returning (image, scale)"""
+    height, width = image.shape[:2]
+    longest = max(height, width)
+    if not max_side or longest <= max_side:
+        return image, 1.0
+    
+    scale = max_side / longest
+    new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(image, new_size, interpolation=cv2.INTER_AREA), scale
+
+def rescale_detections(results, scale):
+    """Map detection boxes found on a downscaled image back to original coordinates"""
+    if scale == 1.0:
+        return results
+    return [([[x / scale, y / scale] for x, y in box], text, confidence) for box, text, confidence in results]
+
+def detection_box(detection):
+    """JSON-friendly form of one EasyOCR (box, text, confidence) detection, confidence in percent"""
+    box, text, confidence = detection
+    return {
+        'text': text,
+        'confidence': round(float(confidence) * 100, 2),
+        'box': [[float(x), float(y)] for x, y in box],
+    }
+
+def format_detections(results, size=None):
+    """Build the response fields from EasyOCR (box, text, confidence) detections
+    
+    size is the original image's [width, height]; it and the detection
+    boxes are kept for structured outputs such as hOCR.
+    """
+    if not results:
+        return {
+            'text': '',
+            'detections': 0,
+            'confidence': 0,
+            'char_count': 0,
+            'boxes': [],
+            'size': size,
+            'success': True
+        }
+    
+    # Extract text and confidence scores
+    extracted_text = ""
+    confidences = []
+    
+    for detection in results:
+        text = detection[1]
+        confidence = detection[2]
+        
+        extracted_text += text + "\n"
+        confidences.append(confidence * 100)  # Convert to percentage
+    
+    # Calculate average confidence
+    avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+    char_count = len(extracted_text.replace('\n', ''))
+    
+    return {
+        'text': extracted_text.strip(),
+        'detections': len(results),
+        'confidence': round(avg_confidence, 2),
+        'char_count': char_count,
+        'boxes': [detection_box(detection) for detection in results],
+        'size': size,
+        'success': True
+    }
+
+def detection_event(detection):
+    """Progress event for one recognised text box"""
+    return {'event': 'detection', **detection_box(detection)}
+
+def readtext_progressive(reader, image, scale, progress, chunk_size=None):
+    """reader.readtext split into one detection pass and recognition of a few boxes at a time
+    
+    Each recognised box is passed to progress as a detection event (in
+    original image coordinates) as soon as its chunk finishes, instead of
+    after the whole image. Returns the rescaled detections in readtext order.
+    """
+    chunk_size = max(1, chunk_size or config['EASYOCR_STREAM_CHUNK'])
+    with metrics.stage('detect'):
+        horizontal_list, free_list = reader.detect(image)
+    horizontal_list, free_list = horizontal_list[0], free_list[0]
+    grey = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    
+    # readtext recognises all horizontal boxes, then all free-form ones
+    chunks = [(horizontal_list[i:i + chunk_size], []) for i in range(0, len(horizontal_list), chunk_size)]
+    chunks += [([], free_list[i:i + chunk_size]) for i in range(0, len(free_list), chunk_size)]
+    results = []
+    for horizontal, free in chunks:
+        with metrics.stage('recognize'):
+            detections = rescale_detections(reader.recognize(grey, horizontal_list=horizontal, free_list=free), scale)
+        for detection in detections:
+            progress(detection_event(detection))
+        results.extend(detections)
+    return results
+
+def model_bytes(model):
+    """Size of a torch model's parameters in bytes"""
+    return sum(param.numel() * param.element_size() for param in model.parameters())
+
+class ReaderPool:
+    """EasyOCR readers keyed by language set, all sharing one text detector
+    
+    The CRAFT detector is language independent, so only the first reader
+    loads it; later readers are built without one and borrow it. Idle
+    readers are evicted least recently used first once the pool holds more
+    than max_readers or its recognizers exceed max_bytes. Readers are handed
+    out through lease() so one in use is never evicted.
+    """
+    
+    def __init__(self, gpu, max_readers=4, max_bytes=512 * 1024 * 1024):
+        self.gpu = gpu
+        self.max_readers = max_readers
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._build_locks = {}
+        self._detector = None
+        self._detector_lock = threading.Lock()
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def lease(self, languages):
+        key = tuple(sorted(set(languages)))
+        entry = self._acquire(key)
+        try:
+            yield entry['reader']
+        finally:
+            with self._lock:
+                entry['in_use'] -= 1
+                self._evict()
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'readers': {
+                    ','.join(key): {'bytes': entry['bytes'], 'load_seconds': entry['load_seconds'], 'in_use': entry['in_use']}
+                    for key, entry in self._entries.items()
+                },
+                'bytes': sum(entry['bytes'] for entry in self._entries.values()),
+                'detector_bytes': self._detector['bytes'] if self._detector else 0,
+            }
+    
+    def _acquire(self, key):
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        
+        # Only one thread builds a given language set; others wait for it
+        with build_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    entry['in_use'] += 1
+                    return entry
+            
+            entry = self._build(key)
+            with self._lock:
+                self._entries[key] = entry
+                self._evict()
+                return entry
+    
+    def _build(self, key):
+        import easyocr
+        
+        print(f"Initializing EasyOCR reader for {', '.join(key)}... (downloading models on first run)")
+        start = time.perf_counter()
+        reader = None
+        if self._detector is None:
+            # Readers for different language sets build concurrently; the first
+            # to get here loads the detector and the others wait to borrow it
+            with self._detector_lock:
+                if self._detector is None:
+                    reader = easyocr.Reader(list(key), gpu=self.gpu, verbose=False)
+                    self._detector = {
+                        'detector': reader.detector,
+                        'get_textbox': reader.get_textbox,
+                        'get_detector': reader.get_detector,
+                        'detect_network': reader.detect_network,
+                        'bytes': model_bytes(reader.detector),
+                    }
+        if reader is None:
+            reader = easyocr.Reader(list(key), gpu=self.gpu, detector=False, verbose=False)
+            reader.detector = self._detector['detector']
+            reader.get_textbox = self._detector['get_textbox']
+            reader.get_detector = self._detector['get_detector']
+            reader.detect_network = self._detector['detect_network']
+        
+        load_seconds = round(time.perf_counter() - start, 3)
+        print(f"EasyOCR reader for {', '.join(key)} loaded in {load_seconds}s")
+        return {'reader': reader, 'bytes': model_bytes(reader.recognizer), 'load_seconds': load_seconds, 'in_use': 1}
+    
+    def _evict(self):
+        # Caller holds the lock
+        def over_budget():
+            total = sum(entry['bytes'] for entry in self._entries.values())
+            return len(self._entries) > self.max_readers or total > self.max_bytes
+        
+        for key in list(self._entries):
+            if not over_budget():
+                break
+            if self._entries[key]['in_use'] == 0:
+                del self._entries[key]
+                print(f"Evicted idle EasyOCR reader for {', '.join(key)}")
+
+def get_reader_pool():
+    """Return the shared EasyOCR reader pool
+    
+    torch (and easyocr, in ReaderPool._build) are imported here rather than at
+    module import, so processes that never serve an EasyOCR request don't pay
+    for them.
+    """
+    global _reader_pool
+    with _reader_pool_lock:
+        if _reader_pool is None:
+            import torch
+            
+            device = config['EASYOCR_DEVICE']
+            gpu = torch.cuda.is_available() if device == 'auto' else device == 'gpu'
+            READER_INFO['device'] = 'gpu' if gpu else 'cpu'
+            _reader_pool = ReaderPool(
+                gpu,
+                max_readers=config['EASYOCR_POOL_MAX_READERS'],
+                max_bytes=config['EASYOCR_POOL_MAX_BYTES'],
+            )
+        return _reader_pool
+
+def warmup_reader(languages=None):
+    """Load a reader and run one dummy inference so the first real request skips torch's first-call setup"""
+    with get_reader_pool().lease(languages or config['EASYOCR_LANGUAGES']) as reader:
+        image = np.full((64, 256, 3), 255, dtype=np.uint8)
+        cv2.putText(image, 'Warmup 123', (8, 44), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+        
+        start = time.perf_counter()
+        reader.readtext(image)
+        READER_INFO['warmup_seconds'] = round(time.perf_counter() - start, 3)
+    print(f"EasyOCR warmup finished in {READER_INFO['warmup_seconds']}s")
+
+def reader_status():
+    """Reader device, warmup time and pool contents for status reporting"""
+    return {'reader': READER_INFO, 'pool': _reader_pool.stats() if _reader_pool is not None else None}
+
+def parse_languages(value):
+    """Parse a comma separated list of EasyOCR language codes, raising ValueError on bad input"""
+    languages = [code.strip() for code in value.split(',') if code.strip()]
+    invalid = [code for code in languages if not re.fullmatch(r'[a-z]{2,3}(_[a-z]+)?', code)]
+    if invalid:
+        raise ValueError(f"Invalid language codes: {', '.join(invalid)}")
+    if not languages:
+        raise ValueError('No languages given')
+    return languages
+
+def cache_key(image, max_side, languages):
+    return make_key(image, 'easyocr', languages=sorted(set(languages)), max_side=max_side)
+
+def extract_text_easyocr(image_path, max_side=None, languages=None, progress=None):
+    """Extract text from image using EasyOCR
+    
+    image_path may also be an already decoded BGR array (None if decoding failed).
+    The image is decoded once and that array is what EasyOCR sees. Images whose
+    longest side exceeds max_side (default EASYOCR_MAX_SIDE) are downscaled
+    first, since detection cost grows with pixel count; boxes are mapped back
+    to original coordinates. languages (default EASYOCR_LANGUAGES) picks the
+    reader from the pool. Results are cached by image content and settings;
+    the 'cache' field reports 'hit' or 'miss'. progress, if given, receives
+    a detection event per text box as recognition proceeds (see
+    readtext_progressive); cache hits produce none.
+    """
+    if max_side is None:
+        max_side = config['EASYOCR_MAX_SIDE']
+    languages = languages or config['EASYOCR_LANGUAGES']
+    try:
+        # Read image
+        if image_path is None or isinstance(image_path, np.ndarray):
+            image = image_path
+        else:
+            with metrics.stage('decode', engine='easyocr'):
+                image = cv2.imread(image_path)
+        if image is None:
+            return metrics.count_result('easyocr', {
+                'text': '',
+                'error': 'Failed to read image file',
+                'success': False
+            })
+        
+        cache = get_cache()
+        if cache is not None:
+            key = cache_key(image, max_side, languages)
+            cached = cache.get(key)
+            if cached is not None:
+                cached['cache'] = 'hit'
+                return metrics.count_result('easyocr', cached)
+        
+        # Run OCR
+        size = [image.shape[1], image.shape[0]]
+        image, scale = downscale_to_max_side(image, max_side)
+        with get_reader_pool().lease(languages) as reader:
+            if progress is None:
+                with metrics.stage('readtext'):
+                    results = rescale_detections(reader.readtext(image), scale)
+            else:
+                results = readtext_progressive(reader, image, scale, progress)
+        
+        result = format_detections(results, size)
+        if cache is not None:
+            cache.put(key, result)
+            result['cache'] = 'miss'
+        return metrics.count_result('easyocr', result)
+    
+    except Exception as e:
+        return metrics.count_result('easyocr', {
+            'text': '',
+            'error': f'OCR Error: {str(e)}',
+            'success': False
+        })
+
+def extract_text_easyocr_batch(images, batch_size=None, max_side=None, languages=None):
+    """Extract text from several decoded BGR arrays, batching the EasyOCR work
+    
+    Images that share a size (after optional downscaling) go through
+    readtext_batched together; the others use readtext, which still batches
+    recognition of their text crops. Returns one result dict per image, in order.
+    """
+    batch_size = batch_size or config['EASYOCR_BATCH_SIZE']
+    if max_side is None:
+        max_side = config['EASYOCR_MAX_SIDE']
+    languages = languages or config['EASYOCR_LANGUAGES']
+    
+    cache = get_cache()
+    outputs = [None] * len(images)
+    keys = [None] * len(images)
+    groups = {}
+    for index, image in enumerate(images):
+        if image is None:
+            outputs[index] = {
+                'text': '',
+                'error': 'Failed to read image file',
+                'success': False
+            }
+            continue
+        if cache is not None:
+            keys[index] = cache_key(image, max_side, languages)
+            cached = cache.get(keys[index])
+            if cached is not None:
+                cached['cache'] = 'hit'
+                outputs[index] = cached
+                continue
+        size = [image.shape[1], image.shape[0]]
+        image, scale = downscale_to_max_side(image, max_side)
+        groups.setdefault(image.shape, []).append((index, image, scale, size))
+    
+    for group in groups.values():
+        arrays = [image for _, image, _, _ in group]
+        try:
+            with get_reader_pool().lease(languages) as reader, metrics.stage('readtext'):
+                if len(arrays) > 1:
+                    batched = reader.readtext_batched(arrays, batch_size=batch_size)
+                else:
+                    batched = [reader.readtext(arrays[0], batch_size=batch_size)]
+            for (index, _, scale, size), results in zip(group, batched):
+                outputs[index] = format_detections(rescale_detections(results, scale), size)
+                if cache is not None:
+                    cache.put(keys[index], outputs[index])
+                    outputs[index]['cache'] = 'miss'
+        except Exception as e:
+            for index, _, _, _ in group:
+                outputs[index] = {
+                    'text': '',
+                    'error': f'OCR Error: {str(e)}',
+                    'success': False
+                }
+    
+    for output in outputs:
+        metrics.count_result('easyocr', output)
+    return outputs
+
+if __name__ == '__main__':
+    # Serve the unified OCRify app with EasyOCR preselected
+    from ocrify import run_server
+    run_server(default_engine='easyocr')
\ No newline at end of file
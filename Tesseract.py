@@ -1,939 +1,656 @@
-from flask import Flask, request, jsonify
-import pytesseract
-from PIL import Image
-import cv2
-import numpy as np
-import os
-from werkzeug.utils import secure_filename
-import base64
-from io import BytesIO
-
-app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['UPLOAD_FOLDER'] = 'uploads'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff'}
-
-# Create uploads folder if it doesn't exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-
-# HTML Template as a string
-HTML_TEMPLATE = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>OCR Text Extractor - AI Powered</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-            background: #0f0f23;
-            min-height: 100vh;
-            padding: 20px;
-            color: #fff;
-            position: relative;
-            overflow-x: hidden;
-        }
-
-        /* Animated background */
-        body::before {
-            content: '';
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: 
-                radial-gradient(circle at 20% 50%, rgba(120, 119, 198, 0.15) 0%, transparent 50%),
-                radial-gradient(circle at 80% 80%, rgba(138, 43, 226, 0.15) 0%, transparent 50%),
-                radial-gradient(circle at 40% 20%, rgba(72, 149, 239, 0.15) 0%, transparent 50%);
-            animation: float 20s ease-in-out infinite;
-            z-index: 0;
-        }
-
-        @keyframes float {
-            0%, 100% { transform: translateY(0) scale(1); }
-            50% { transform: translateY(-20px) scale(1.05); }
-        }
-
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-            position: relative;
-            z-index: 1;
-        }
-
-        .header {
-            text-align: center;
-            margin-bottom: 50px;
-            animation: fadeInDown 0.8s ease-out;
-        }
-
-        @keyframes fadeInDown {
-            from {
-                opacity: 0;
-                transform: translateY(-30px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-
-        .header h1 {
-            font-size: 3.5em;
-            margin-bottom: 15px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            font-weight: 800;
-            letter-spacing: -1px;
-        }
-
-        .header .subtitle {
-            font-size: 1.2em;
-            color: #a0a0c0;
-            font-weight: 300;
-        }
-
-        .header .tagline {
-            display: inline-block;
-            margin-top: 10px;
-            padding: 8px 20px;
-            background: rgba(102, 126, 234, 0.2);
-            border-radius: 20px;
-            font-size: 0.9em;
-            color: #8b9cff;
-            border: 1px solid rgba(102, 126, 234, 0.3);
-        }
-
-        .main-content {
-            background: rgba(25, 25, 45, 0.6);
-            backdrop-filter: blur(20px);
-            border-radius: 30px;
-            padding: 50px;
-            box-shadow: 0 30px 90px rgba(0, 0, 0, 0.5),
-                        0 0 0 1px rgba(255, 255, 255, 0.05);
-            border: 1px solid rgba(255, 255, 255, 0.05);
-            animation: fadeInUp 0.8s ease-out 0.2s both;
-        }
-
-        @keyframes fadeInUp {
-            from {
-                opacity: 0;
-                transform: translateY(30px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-
-        .upload-section {
-            text-align: center;
-            padding: 60px 40px;
-            border: 3px dashed rgba(102, 126, 234, 0.4);
-            border-radius: 20px;
-            background: rgba(102, 126, 234, 0.05);
-            transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-            cursor: pointer;
-            position: relative;
-            overflow: hidden;
-        }
-
-        .upload-section::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(102, 126, 234, 0.1), transparent);
-            transition: left 0.6s;
-        }
-
-        .upload-section:hover::before {
-            left: 100%;
-        }
-
-        .upload-section:hover {
-            border-color: #667eea;
-            background: rgba(102, 126, 234, 0.1);
-            transform: translateY(-5px);
-            box-shadow: 0 20px 40px rgba(102, 126, 234, 0.2);
-        }
-
-        .upload-section.dragover {
-            border-color: #f093fb;
-            background: rgba(240, 147, 251, 0.1);
-            transform: scale(1.02);
-        }
-
-        .upload-icon {
-            font-size: 5em;
-            margin-bottom: 20px;
-            animation: bounce 2s infinite;
-        }
-
-        @keyframes bounce {
-            0%, 100% { transform: translateY(0); }
-            50% { transform: translateY(-10px); }
-        }
-
-        .upload-section h2 {
-            color: #fff;
-            margin-bottom: 10px;
-            font-size: 1.8em;
-            font-weight: 600;
-        }
-
-        .upload-section p {
-            color: #a0a0c0;
-            margin-bottom: 30px;
-            font-size: 1.1em;
-        }
-
-        #fileInput {
-            display: none;
-        }
-
-        .btn {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border: none;
-            padding: 16px 40px;
-            border-radius: 30px;
-            font-size: 1.1em;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            font-weight: 600;
-            box-shadow: 0 10px 30px rgba(102, 126, 234, 0.3);
-            position: relative;
-            overflow: hidden;
-        }
-
-        .btn::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.2), transparent);
-            transition: left 0.5s;
-        }
-
-        .btn:hover::before {
-            left: 100%;
-        }
-
-        .btn:hover {
-            transform: translateY(-3px);
-            box-shadow: 0 15px 40px rgba(102, 126, 234, 0.5);
-        }
-
-        .btn:active {
-            transform: translateY(-1px);
-        }
-
-        .btn:disabled {
-            opacity: 0.5;
-            cursor: not-allowed;
-        }
-
-        .results-section {
-            display: none;
-            margin-top: 40px;
-            animation: fadeInUp 0.6s ease-out;
-        }
-
-        .results-header {
-            color: #fff;
-            margin-bottom: 30px;
-            font-size: 2em;
-            font-weight: 700;
-            text-align: center;
-        }
-
-        .results-grid {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 30px;
-            margin-top: 20px;
-        }
-
-        @media (max-width: 968px) {
-            .results-grid {
-                grid-template-columns: 1fr;
-            }
-            .header h1 {
-                font-size: 2.5em;
-            }
-            .main-content {
-                padding: 30px 20px;
-            }
-        }
-
-        .result-card {
-            background: rgba(35, 35, 60, 0.6);
-            backdrop-filter: blur(10px);
-            border-radius: 20px;
-            padding: 30px;
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.3);
-            border: 1px solid rgba(255, 255, 255, 0.05);
-            transition: all 0.3s ease;
-        }
-
-        .result-card:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 15px 40px rgba(0, 0, 0, 0.4);
-        }
-
-        .result-card h3 {
-            background: linear-gradient(135deg, #667eea, #764ba2);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            margin-bottom: 20px;
-            font-size: 1.5em;
-            font-weight: 700;
-        }
-
-        .image-container {
-            position: relative;
-            border-radius: 15px;
-            overflow: hidden;
-            margin-bottom: 20px;
-            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.3);
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }
-
-        .image-container:hover {
-            transform: scale(1.02);
-            box-shadow: 0 15px 40px rgba(102, 126, 234, 0.3);
-        }
-
-        .image-preview {
-            width: 100%;
-            display: block;
-            border-radius: 15px;
-        }
-
-        .image-overlay {
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: rgba(0, 0, 0, 0.7);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            opacity: 0;
-            transition: opacity 0.3s ease;
-            border-radius: 15px;
-        }
-
-        .image-container:hover .image-overlay {
-            opacity: 1;
-        }
-
-        .image-overlay span {
-            color: white;
-            font-size: 1.2em;
-            font-weight: 600;
-            padding: 10px 20px;
-            background: rgba(102, 126, 234, 0.8);
-            border-radius: 10px;
-        }
-
-        .extracted-text {
-            background: rgba(20, 20, 35, 0.8);
-            padding: 25px;
-            border-radius: 15px;
-            border-left: 4px solid #667eea;
-            white-space: pre-wrap;
-            word-wrap: break-word;
-            max-height: 400px;
-            overflow-y: auto;
-            font-family: 'Monaco', 'Courier New', monospace;
-            line-height: 1.8;
-            color: #e0e0f0;
-            font-size: 0.95em;
-        }
-
-        .extracted-text::-webkit-scrollbar {
-            width: 8px;
-        }
-
-        .extracted-text::-webkit-scrollbar-track {
-            background: rgba(0, 0, 0, 0.2);
-            border-radius: 10px;
-        }
-
-        .extracted-text::-webkit-scrollbar-thumb {
-            background: #667eea;
-            border-radius: 10px;
-        }
-
-        .stats {
-            display: flex;
-            gap: 15px;
-            margin-bottom: 20px;
-        }
-
-        .stat-item {
-            background: rgba(102, 126, 234, 0.1);
-            padding: 15px;
-            border-radius: 12px;
-            flex: 1;
-            text-align: center;
-            border: 1px solid rgba(102, 126, 234, 0.2);
-            transition: all 0.3s ease;
-        }
-
-        .stat-item:hover {
-            background: rgba(102, 126, 234, 0.15);
-            transform: translateY(-3px);
-        }
-
-        .stat-value {
-            font-size: 2em;
-            font-weight: 800;
-            background: linear-gradient(135deg, #667eea, #f093fb);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-        }
-
-        .stat-label {
-            font-size: 0.9em;
-            color: #a0a0c0;
-            margin-top: 5px;
-        }
-
-        .loading {
-            display: none;
-            text-align: center;
-            padding: 60px;
-        }
-
-        .spinner {
-            width: 60px;
-            height: 60px;
-            margin: 0 auto 30px;
-            position: relative;
-        }
-
-        .spinner::before,
-        .spinner::after {
-            content: '';
-            position: absolute;
-            border-radius: 50%;
-            animation: pulse 2s ease-in-out infinite;
-        }
-
-        .spinner::before {
-            width: 60px;
-            height: 60px;
-            border: 4px solid rgba(102, 126, 234, 0.3);
-            animation: spin 1s linear infinite;
-        }
-
-        .spinner::after {
-            width: 60px;
-            height: 60px;
-            border: 4px solid transparent;
-            border-top-color: #667eea;
-            border-right-color: #764ba2;
-            animation: spin 1s linear infinite;
-        }
-
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-
-        @keyframes pulse {
-            0%, 100% { opacity: 1; }
-            50% { opacity: 0.5; }
-        }
-
-        .loading p {
-            color: #a0a0c0;
-            font-size: 1.1em;
-        }
-
-        .error {
-            background: rgba(255, 59, 92, 0.2);
-            color: #ff6b9d;
-            padding: 20px;
-            border-radius: 15px;
-            margin-top: 20px;
-            display: none;
-            border: 1px solid rgba(255, 59, 92, 0.3);
-            animation: shake 0.5s;
-        }
-
-        @keyframes shake {
-            0%, 100% { transform: translateX(0); }
-            25% { transform: translateX(-10px); }
-            75% { transform: translateX(10px); }
-        }
-
-        .copy-btn {
-            background: linear-gradient(135deg, #11998e, #38ef7d);
-            color: white;
-            border: none;
-            padding: 12px 30px;
-            border-radius: 25px;
-            cursor: pointer;
-            font-size: 1em;
-            font-weight: 600;
-            margin-top: 15px;
-            box-shadow: 0 8px 20px rgba(56, 239, 125, 0.3);
-            transition: all 0.3s ease;
-        }
-
-        .copy-btn:hover {
-            transform: translateY(-3px);
-            box-shadow: 0 12px 30px rgba(56, 239, 125, 0.4);
-        }
-
-        .copy-btn:active {
-            transform: translateY(-1px);
-        }
-
-        /* Modal for full image view */
-        .modal {
-            display: none;
-            position: fixed;
-            z-index: 1000;
-            left: 0;
-            top: 0;
-            width: 100%;
-            height: 100%;
-            background-color: rgba(0, 0, 0, 0.95);
-            animation: fadeIn 0.3s;
-        }
-
-        @keyframes fadeIn {
-            from { opacity: 0; }
-            to { opacity: 1; }
-        }
-
-        .modal-content {
-            margin: auto;
-            display: block;
-            max-width: 90%;
-            max-height: 90%;
-            position: absolute;
-            top: 50%;
-            left: 50%;
-            transform: translate(-50%, -50%);
-            border-radius: 10px;
-            box-shadow: 0 20px 60px rgba(0, 0, 0, 0.5);
-        }
-
-        .close-modal {
-            position: absolute;
-            top: 30px;
-            right: 50px;
-            color: #fff;
-            font-size: 40px;
-            font-weight: bold;
-            cursor: pointer;
-            z-index: 1001;
-            transition: all 0.3s ease;
-        }
-
-        .close-modal:hover {
-            color: #667eea;
-            transform: rotate(90deg);
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>✨ OCR Text Extractor</h1>
-            <p class="subtitle">AI-Powered Document Text Recognition</p>
-            <div class="tagline">🚀 Extract text from any image instantly</div>
-        </div>
-
-        <div class="main-content">
-            <div class="upload-section" id="uploadSection">
-                <div class="upload-icon">📸</div>
-                <h2>Upload Your Document</h2>
-                <p>Drag and drop an image here or click to browse</p>
-                <input type="file" id="fileInput" accept="image/*">
-                <button class="btn" onclick="document.getElementById('fileInput').click()">
-                    Choose File
-                </button>
-            </div>
-
-            <div class="loading" id="loading">
-                <div class="spinner"></div>
-                <p>🔍 Processing image and extracting text...</p>
-            </div>
-
-            <div class="error" id="error"></div>
-
-            <div class="results-section" id="results">
-                <h2 class="results-header">✅ Extraction Results</h2>
-                <div class="results-grid">
-                    <div class="result-card">
-                        <h3>📷 Original Image</h3>
-                        <div class="image-container" onclick="openModal()">
-                            <img id="previewImage" class="image-preview" alt="Uploaded image">
-                            <div class="image-overlay">
-                                <span>🔍 Click to view full size</span>
-                            </div>
-                        </div>
-                        <div class="stats">
-                            <div class="stat-item">
-                                <div class="stat-value" id="regionsCount">0</div>
-                                <div class="stat-label">Text Regions</div>
-                            </div>
-                            <div class="stat-item">
-                                <div class="stat-value" id="charCount">0</div>
-                                <div class="stat-label">Characters</div>
-                            </div>
-                            <div class="stat-item">
-                                <div class="stat-value" id="confidence">0%</div>
-                                <div class="stat-label">Confidence</div>
-                            </div>
-                        </div>
-                    </div>
-                    <div class="result-card">
-                        <h3>📝 Extracted Text</h3>
-                        <div class="extracted-text" id="extractedText"></div>
-                        <button class="copy-btn" onclick="copyText()">📋 Copy Text</button>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Modal for full image view -->
-    <div id="imageModal" class="modal" onclick="closeModal()">
-        <span class="close-modal">&times;</span>
-        <img class="modal-content" id="modalImage">
-    </div>
-
-    <script>
-        const uploadSection = document.getElementById('uploadSection');
-        const fileInput = document.getElementById('fileInput');
-        const loading = document.getElementById('loading');
-        const results = document.getElementById('results');
-        const error = document.getElementById('error');
-        let currentImageData = '';
-
-        uploadSection.addEventListener('dragover', (e) => {
-            e.preventDefault();
-            uploadSection.classList.add('dragover');
-        });
-
-        uploadSection.addEventListener('dragleave', () => {
-            uploadSection.classList.remove('dragover');
-        });
-
-        uploadSection.addEventListener('drop', (e) => {
-            e.preventDefault();
-            uploadSection.classList.remove('dragover');
-            const files = e.dataTransfer.files;
-            if (files.length > 0) {
-                handleFile(files[0]);
-            }
-        });
-
-        fileInput.addEventListener('change', (e) => {
-            if (e.target.files.length > 0) {
-                handleFile(e.target.files[0]);
-            }
-        });
-
-        function handleFile(file) {
-            if (!file.type.startsWith('image/')) {
-                showError('Please upload a valid image file');
-                return;
-            }
-
-            const formData = new FormData();
-            formData.append('file', file);
-
-            uploadSection.style.display = 'none';
-            loading.style.display = 'block';
-            results.style.display = 'none';
-            error.style.display = 'none';
-
-            fetch('/upload', {
-                method: 'POST',
-                body: formData
-            })
-            .then(response => response.json())
-            .then(data => {
-                loading.style.display = 'none';
-                
-                if (data.success) {
-                    displayResults(data);
-                } else {
-                    showError(data.error || 'An error occurred during processing');
-                }
-            })
-            .catch(err => {
-                loading.style.display = 'none';
-                showError('Failed to process image: ' + err.message);
-            });
-        }
-
-        function displayResults(data) {
-            currentImageData = 'data:image/jpeg;base64,' + data.image;
-            document.getElementById('previewImage').src = currentImageData;
-            document.getElementById('extractedText').textContent = data.text || 'No text detected';
-            document.getElementById('regionsCount').textContent = data.regions_count || 0;
-            document.getElementById('charCount').textContent = data.text.length || 0;
-            document.getElementById('confidence').textContent = (data.avg_confidence || 0) + '%';
-            
-            results.style.display = 'block';
-            uploadSection.style.display = 'block';
-        }
-
-        function showError(message) {
-            error.textContent = '❌ ' + message;
-            error.style.display = 'block';
-            uploadSection.style.display = 'block';
-        }
-
-        function copyText() {
-            const text = document.getElementById('extractedText').textContent;
-            navigator.clipboard.writeText(text).then(() => {
-                const btn = event.target;
-                const originalText = btn.textContent;
-                btn.textContent = '✅ Copied!';
-                setTimeout(() => {
-                    btn.textContent = originalText;
-                }, 2000);
-            });
-        }
-
-        function openModal() {
-            const modal = document.getElementById('imageModal');
-            const modalImg = document.getElementById('modalImage');
-            modal.style.display = 'block';
-            modalImg.src = currentImageData;
-        }
-
-        function closeModal() {
-            document.getElementById('imageModal').style.display = 'none';
-        }
-
-        // Close modal with Escape key
-        document.addEventListener('keydown', (e) => {
-            if (e.key === 'Escape') {
-                closeModal();
-            }
-        });
-    </script>
-</body>
-</html>
-"""
-
-def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
-def preprocess_image(image, method='adaptive'):
-    """Preprocess image for better OCR results with multiple techniques"""
-    img_array = np.array(image)
-    
-    # Convert to grayscale
-    if len(img_array.shape) == 3:
-        gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-    else:
-        gray = img_array
-    
-    # Resize image for better OCR (larger is usually better)
-    height, width = gray.shape
-    if height < 1000:
-        scale_factor = 1000 / height
-        new_width = int(width * scale_factor)
-        gray = cv2.resize(gray, (new_width, 1000), interpolation=cv2.INTER_CUBIC)
-    
-    if method == 'adaptive':
-        # Denoise
-        denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
-        
-        # Increase contrast using CLAHE
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        contrast = clahe.apply(denoised)
-        
-        # Apply adaptive thresholding
-        binary = cv2.adaptiveThreshold(
-            contrast, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-            cv2.THRESH_BINARY, 11, 2
-        )
-        
-        return binary
-    
-    elif method == 'otsu':
-        # Denoise
-        denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
-        
-        # Apply Gaussian blur
-        blurred = cv2.GaussianBlur(denoised, (5, 5), 0)
-        
-        # Otsu's thresholding
-        _, binary = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        
-        return binary
-    
-    elif method == 'simple':
-        # Just enhance contrast
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(gray)
-        
-        return enhanced
-    
-    else:
-        return gray
-
-def detect_text_regions(image):
-    """Detect text regions in the image"""
-    img_array = np.array(image)
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY) if len(img_array.shape) == 3 else img_array
-    
-    _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV)
-    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    
-    text_regions = []
-    for contour in contours:
-        area = cv2.contourArea(contour)
-        if area > 100:
-            x, y, w, h = cv2.boundingRect(contour)
-            text_regions.append((x, y, w, h))
-    
-    return text_regions
-
-def extract_text(image_path):
-    """Extract text from image using Tesseract OCR with enhanced configuration"""
-    try:
-        image = Image.open(image_path)
-        
-        # Try multiple preprocessing methods and configurations
-        results = []
-        
-        # Method 1: Adaptive preprocessing with PSM 3 (auto page segmentation)
-        processed_img1 = preprocess_image(image, 'adaptive')
-        config1 = r'--oem 3 --psm 3 -c preserve_interword_spaces=1'
-        text1 = pytesseract.image_to_string(processed_img1, config=config1)
-        results.append(('adaptive_psm3', text1, processed_img1))
-        
-        # Method 2: Otsu preprocessing with PSM 6 (uniform block)
-        processed_img2 = preprocess_image(image, 'otsu')
-        config2 = r'--oem 3 --psm 6 -c preserve_interword_spaces=1'
-        text2 = pytesseract.image_to_string(processed_img2, config=config2)
-        results.append(('otsu_psm6', text2, processed_img2))
-        
-        # Method 3: Simple enhancement with PSM 4 (single column)
-        processed_img3 = preprocess_image(image, 'simple')
-        config3 = r'--oem 3 --psm 4 -c preserve_interword_spaces=1'
-        text3 = pytesseract.image_to_string(processed_img3, config=config3)
-        results.append(('simple_psm4', text3, processed_img3))
-        
-        # Method 4: Adaptive with PSM 11 (sparse text)
-        config4 = r'--oem 3 --psm 11 -c preserve_interword_spaces=1'
-        text4 = pytesseract.image_to_string(processed_img1, config=config4)
-        results.append(('adaptive_psm11', text4, processed_img1))
-        
-        # Method 5: Original image with PSM 3
-        config5 = r'--oem 3 --psm 3 -l eng'
-        text5 = pytesseract.image_to_string(image, config=config5)
-        results.append(('original_psm3', text5, image))
-        
-        # Select the longest non-empty result
-        valid_results = [(name, text, img) for name, text, img in results if text.strip()]
-        if valid_results:
-            best_name, best_text, best_img = max(valid_results, key=lambda x: len(x[1]))
-        else:
-            best_name, best_text, best_img = results[0]
-        
-        # Get confidence data from best result
-        data = pytesseract.image_to_data(best_img, output_type=pytesseract.Output.DICT)
-        text_regions = detect_text_regions(image)
-        
-        # Calculate average confidence
-        confidences = [int(conf) for conf in data['conf'] if conf != '-1' and int(conf) > 0]
-        avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-        
-        return {
-            'text': best_text.strip(),
-            'confidence': data,
-            'regions': text_regions,
-            'avg_confidence': round(avg_confidence, 2),
-            'method_used': best_name,
-            'success': True
-        }
-    except Exception as e:
-        return {
-            'text': '',
-            'error': str(e),
-            'success': False
-        }
-
-@app.route('/')
-def index():
-    return HTML_TEMPLATE
-
-@app.route('/upload', methods=['POST'])
-def upload_file():
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file uploaded'}), 400
-    
-    file = request.files['file']
-    
-    if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
-    
-    if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
-        result = extract_text(filepath)
-        
-        with open(filepath, 'rb') as img_file:
-            img_base64 = base64.b64encode(img_file.read()).decode('utf-8')
-        
-        os.remove(filepath)
-        
-        if result['success']:
-            return jsonify({
-                'text': result['text'],
-                'regions_count': len(result['regions']),
-                'avg_confidence': result.get('avg_confidence', 0),
-                'image': img_base64,
-                'success': True
-            })
-        else:
-            return jsonify({'error': result['error'], 'success': False}), 500
-    
-    return jsonify({'error': 'Invalid file type'}), 400
-
-if __name__ == '__main__':
-    print("=" * 50)
-    print("OCR Text Extractor Server Starting...")
-    print("=" * 50)
-    print("Server running at: http://127.0.0.1:5000")
-    print("Or access via: http://localhost:5000")
-    print("=" * 50)
-    print("Press CTRL+C to stop the server")
-    print("=" * 50)
-    app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=True)
\ No newline at end of file
+import pytesseract
+from PIL import Image
+import cv2
+import numpy as np
+import contextvars
+import os
+import threading
+import time
+from functools import cached_property, partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from ocr_cache import get_cache, make_key
+import metrics
+import strategy_stats
+import tessapi
+
+config = {
+    'OCR_EXECUTOR': 'thread',  # 'thread' or 'process'
+    'OCR_MAX_WORKERS': os.cpu_count() or 1,  # shared by all requests
+    'OCR_REQUEST_CONCURRENCY': 3,  # max strategies in flight per request
+    'OCR_MODE': 'all',  # 'all' runs every strategy, 'cascade' stops at the first confident one, 'pruned' skips rarely winning ones
+    'OCR_CASCADE_ORDER': ['original_psm3', 'simple_psm4', 'adaptive_psm3', 'otsu_psm6', 'adaptive_psm11'],
+    'OCR_CASCADE_THRESHOLD': 80.0,  # mean word confidence needed to stop the cascade
+    'OCR_BACKEND': 'auto',  # 'capi' (in-process libtesseract), 'subprocess' (pytesseract) or 'auto'
+    'OCR_TESSERACT_LIBRARY': None,  # libtesseract path for the capi backend; found automatically if None
+    'OCR_TILE_MIN_HEIGHT': 5000,  # taller images are OCR'd in horizontal bands (above A4/Legal pages at 300dpi); None disables tiling
+    'OCR_TILE_HEIGHT': 1500,  # target band height before snapping the cut to whitespace
+    'OCR_TILE_SEARCH': 200,  # rows searched on each side of the target cut for the emptiest row
+    'OCR_TILE_OVERLAP': 64,  # rows each band extends past its cuts so straddling glyphs stay whole
+    'OCR_TILE_WORKERS': 2,  # bands OCR'd concurrently, shared by all requests
+}
+OCR_MODES = ('all', 'cascade', 'pruned')
+OCR_BACKENDS = ('auto', 'capi', 'subprocess')
+
+# Tesseract strategies: (name, preprocessing method or None for the original image, config)
+TESSERACT_STRATEGIES = [
+    ('adaptive_psm3', 'adaptive', r'--oem 3 --psm 3 -c preserve_interword_spaces=1'),  # auto page segmentation
+    ('otsu_psm6', 'otsu', r'--oem 3 --psm 6 -c preserve_interword_spaces=1'),  # uniform block
+    ('simple_psm4', 'simple', r'--oem 3 --psm 4 -c preserve_interword_spaces=1'),  # single column
+    ('adaptive_psm11', 'adaptive', r'--oem 3 --psm 11 -c preserve_interword_spaces=1'),  # sparse text
+    ('original_psm3', None, r'--oem 3 --psm 3 -l eng'),
+]
+
+STRATEGY_LOOKUP = {name: (method, tesseract_config) for name, method, tesseract_config in TESSERACT_STRATEGIES}
+
+_executor = None
+_executor_lock = threading.Lock()
+_tile_executor = None
+
+class PreprocessPipeline:
+    """Computes each preprocessing intermediate of one image once and shares it across methods"""
+    
+    def __init__(self, image):
+        self.image = image
+        self._results = {}
+    
+    @cached_property
+    def array(self):
+        # PIL decodes lazily, so this is where the upload is actually decoded
+        with metrics.stage('decode', engine='tesseract'):
+            return np.array(self.image)
+    
+    @cached_property
+    def gray(self):
+        # Convert to grayscale
+        if len(self.array.shape) == 3:
+            return cv2.cvtColor(self.array, cv2.COLOR_RGB2GRAY)
+        return self.array
+    
+    @cached_property
+    def resized(self):
+        # Resize image for better OCR (larger is usually better)
+        height, width = self.gray.shape
+        if height < 1000:
+            scale_factor = 1000 / height
+            new_width = int(width * scale_factor)
+            return cv2.resize(self.gray, (new_width, 1000), interpolation=cv2.INTER_CUBIC)
+        return self.gray
+    
+    @cached_property
+    def denoised(self):
+        return cv2.fastNlMeansDenoising(self.resized, None, 10, 7, 21)
+    
+    @cached_property
+    def clahe(self):
+        # Increase contrast of the denoised image using CLAHE
+        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        return clahe.apply(self.denoised)
+    
+    def result(self, method):
+        """Return the final image for a preprocessing method"""
+        if method not in self._results:
+            with metrics.stage('preprocess', method=method):
+                self._results[method] = self._compute(method)
+        return self._results[method]
+    
+    def _compute(self, method):
+        if method == 'adaptive':
+            # Apply adaptive thresholding
+            return cv2.adaptiveThreshold(
+                self.clahe, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                cv2.THRESH_BINARY, 11, 2
+            )
+        
+        elif method == 'otsu':
+            # Apply Gaussian blur, then Otsu's thresholding
+            blurred = cv2.GaussianBlur(self.denoised, (5, 5), 0)
+            _, binary = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            return binary
+        
+        elif method == 'simple':
+            # Just enhance contrast
+            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+            return clahe.apply(self.resized)
+        
+        else:
+            return self.resized
+
+class BatchPreprocessor:
+    """Preprocesses a batch of same-size images into output buffers reused across calls
+    
+    Gives the same images as PreprocessPipeline, but each stage writes the
+    whole batch into one preallocated (N, height, width) buffer instead of
+    allocating per image, and a stacked RGB batch is converted to grayscale
+    in a single call. The buffers are kept while the batch shape stays the
+    same, so the arrays returned by run() are overwritten by the next call.
+    Not thread safe; use one per thread.
+    """
+    
+    def __init__(self):
+        self._buffers = {}
+        self._clahe = {clip_limit: cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8)) for clip_limit in (2.0, 3.0)}
+    
+    def _buffer(self, name, shape):
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = self._buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buffer
+    
+    def _gray(self, images):
+        shapes = {image.shape for image in images}
+        if not shapes:
+            raise ValueError('Empty batch')
+        if len(shapes) != 1:
+            raise ValueError(f'Batch images differ in size: {sorted(shapes)}')
+        shape = shapes.pop()
+        if isinstance(images, np.ndarray) and len(shape) == 2:
+            return images
+        if len(shape) == 2:
+            gray = self._buffer('gray', (len(images), *shape))
+            for i, image in enumerate(images):
+                gray[i] = image
+            return gray
+        
+        gray = self._buffer('gray', (len(images), *shape[:2]))
+        if isinstance(images, np.ndarray) and images.flags.c_contiguous:
+            # Per-pixel conversion: the stack converts as one tall image
+            width, channels = shape[1:]
+            cv2.cvtColor(images.reshape(-1, width, channels), cv2.COLOR_RGB2GRAY, dst=gray.reshape(-1, width))
+        else:
+            for i, image in enumerate(images):
+                cv2.cvtColor(image, cv2.COLOR_RGB2GRAY, dst=gray[i])
+        return gray
+    
+    def _resized(self, gray):
+        count, height, width = gray.shape
+        if height >= 1000:
+            return gray
+        resized = self._buffer('resized', (count, 1000, int(width * (1000 / height))))
+        for i in range(count):
+            cv2.resize(gray[i], resized.shape[:0:-1], dst=resized[i], interpolation=cv2.INTER_CUBIC)
+        return resized
+    
+    def _each(self, name, source, apply):
+        """Fill buffer name with apply(source image, output image) for every image in the batch"""
+        output = self._buffer(name, source.shape)
+        for i in range(len(source)):
+            apply(source[i], output[i])
+        return output
+    
+    def run(self, images, methods=('adaptive',)):
+        """Preprocess a list or (N, height, width[, 3]) stack of uint8 images, L or RGB
+        
+        Returns {method: (N, height, width) array} for each of methods, using
+        the same method names as preprocess_image.
+        """
+        with metrics.stage('preprocess_batch'):
+            resized = self._resized(self._gray(images))
+            results = {}
+            if {'adaptive', 'otsu'} & set(methods):
+                denoised = self._each('denoised', resized, lambda src, dst: cv2.fastNlMeansDenoising(src, dst, 10, 7, 21))
+            for method in methods:
+                if method == 'adaptive':
+                    clahe = self._each('clahe', denoised, self._clahe[3.0].apply)
+                    results[method] = self._each('adaptive', clahe, lambda src, dst: cv2.adaptiveThreshold(
+                        src, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2, dst=dst
+                    ))
+                elif method == 'otsu':
+                    blurred = self._each('blurred', denoised, lambda src, dst: cv2.GaussianBlur(src, (5, 5), 0, dst=dst))
+                    results[method] = self._each('otsu', blurred, lambda src, dst: cv2.threshold(
+                        src, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=dst
+                    ))
+                elif method == 'simple':
+                    results[method] = self._each('simple', resized, self._clahe[2.0].apply)
+                else:
+                    results[method] = resized
+            return results
+
+def preprocess_image(image, method='adaptive'):
+    """Preprocess image for better OCR results with multiple techniques
+    
+    Pass a PreprocessPipeline instead of an image to share intermediates
+    between several methods.
+    """
+    pipeline = image if isinstance(image, PreprocessPipeline) else PreprocessPipeline(image)
+    return pipeline.result(method)
+
+def preprocess_batch(images, method='adaptive', preprocessor=None):
+    """preprocess_image for a list or stack of same-size arrays, returning an (N, height, width) array
+    
+    Pass a BatchPreprocessor to reuse its buffers across calls; the result
+    is then overwritten by its next call.
+    """
+    preprocessor = preprocessor or BatchPreprocessor()
+    return preprocessor.run(images, [method])[method]
+
+def detect_text_regions(image):
+    """Detect text regions in the image"""
+    img_array = np.asarray(image)
+    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY) if len(img_array.shape) == 3 else img_array
+    
+    _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY_INV)
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    
+    text_regions = []
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if area > 100:
+            x, y, w, h = cv2.boundingRect(contour)
+            text_regions.append((x, y, w, h))
+    
+    return text_regions
+
+def get_executor():
+    """Return the shared strategy worker pool, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            max_workers = max(1, config['OCR_MAX_WORKERS'])
+            if config['OCR_EXECUTOR'] == 'process':
+                _executor = ProcessPoolExecutor(max_workers=max_workers)
+            else:
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tesseract')
+        return _executor
+
+def active_backend():
+    """Return the backend OCR passes use: 'capi' when libtesseract loads (or is required), else 'subprocess'"""
+    backend = config['OCR_BACKEND']
+    if backend not in OCR_BACKENDS:
+        raise ValueError(f'Invalid OCR_BACKEND: {backend}')
+    if backend == 'subprocess':
+        return 'subprocess'
+    try:
+        tessapi.load_library(config['OCR_TESSERACT_LIBRARY'])
+    except OSError:
+        if backend == 'capi':
+            raise
+        return 'subprocess'
+    return 'capi'
+
+def get_tile_executor():
+    """Return the shared band worker pool, creating it on first use
+    
+    Bands run on their own threads rather than the strategy pool because each
+    band submits its strategies to that pool and waits for them.
+    """
+    global _tile_executor
+    with _executor_lock:
+        if _tile_executor is None:
+            _tile_executor = ThreadPoolExecutor(max_workers=max(1, config['OCR_TILE_WORKERS']), thread_name_prefix='tesseract-tile')
+        return _tile_executor
+
+def image_to_text_and_data(image, tesseract_config=''):
+    """Run Tesseract once and return both its plain text and its image_to_data dict
+    
+    Asking a single tesseract pass for the txt and tsv renderers together
+    gives the same text as image_to_string and the same word boxes and
+    confidences as image_to_data, at the cost of one OCR pass. The capi
+    backend runs the pass on a persistent per-thread TessBaseAPI; configs it
+    cannot translate fall back to a tesseract process unless OCR_BACKEND is
+    'capi'.
+    """
+    if active_backend() == 'capi':
+        try:
+            text, tsv = tessapi.image_to_text_and_tsv(image, tesseract_config)
+            return text, pytesseract.pytesseract.file_to_dict(tsv, '\t', -1)
+        except tessapi.UnsupportedConfig:
+            if config['OCR_BACKEND'] == 'capi':
+                raise
+    
+    with pytesseract.pytesseract.save(image) as (temp_name, input_filename):
+        pytesseract.pytesseract.run_tesseract(
+            input_filename, temp_name, 'txt', None, f'-c tessedit_create_tsv=1 {tesseract_config.strip()}'
+        )
+        with open(f'{temp_name}.txt', encoding='utf-8') as text_file:
+            text = text_file.read()
+        with open(f'{temp_name}.tsv', encoding='utf-8') as tsv_file:
+            data = pytesseract.pytesseract.file_to_dict(tsv_file.read(), '\t', -1)
+    return text, data
+
+def run_strategy(image, tesseract_config):
+    """Run a single Tesseract pass (module level so process pools can pickle it)
+    
+    Returns (text, data, seconds); the pass is timed here because a
+    process pool worker can't record metrics for the parent.
+    """
+    started = time.perf_counter()
+    text, data = image_to_text_and_data(image, tesseract_config)
+    return text, data, time.perf_counter() - started
+
+def record_strategy(name, seconds):
+    metrics.record_stage('tesseract', seconds, strategy=name)
+    metrics.inc('ocr_strategy_runs_total', strategy=name)
+
+def strategy_event(name, text, data):
+    """Progress event for one finished strategy"""
+    return {'event': 'strategy', 'strategy': name, 'text': text.strip(), 'avg_confidence': round(mean_confidence(data), 2)}
+
+def report_strategy(name, progress, future):
+    """Future callback that reports a finished strategy; failures surface in run_strategies instead"""
+    if future.exception() is None:
+        text, data, _ = future.result()
+        progress(strategy_event(name, text, data))
+
+def run_strategies(jobs, progress=None):
+    """Run (name, image, tesseract config) jobs concurrently and return (name, text, image, data, seconds) in job order
+    
+    progress, if given, is called with a strategy event from the worker's
+    completion callback as soon as each strategy finishes.
+    """
+    executor = get_executor()
+    in_flight = threading.BoundedSemaphore(max(1, config['OCR_REQUEST_CONCURRENCY']))
+    futures = []
+    for name, img, tesseract_config in jobs:
+        in_flight.acquire()
+        try:
+            future = executor.submit(run_strategy, img, tesseract_config)
+        except Exception:
+            in_flight.release()
+            raise
+        future.add_done_callback(lambda _: in_flight.release())
+        if progress is not None:
+            future.add_done_callback(partial(report_strategy, name, progress))
+        futures.append((name, future, img))
+    
+    results = []
+    for name, future, img in futures:
+        text, data, seconds = future.result()
+        record_strategy(name, seconds)
+        results.append((name, text, img, data, seconds))
+    return results
+
+def strategy_image(pipeline, method):
+    """Return the image a strategy runs on (the original image when method is None)"""
+    if method is None:
+        return pipeline.image
+    return preprocess_image(pipeline, method)
+
+def mean_confidence(data):
+    """Average confidence of the recognised words in image_to_data output"""
+    confidences = [int(conf) for conf in data['conf'] if conf != '-1' and int(conf) > 0]
+    return sum(confidences) / len(confidences) if confidences else 0
+
+def run_cascade(pipeline, order, threshold, progress=None):
+    """Run strategies one at a time, stopping once the mean word confidence reaches threshold
+    
+    Each pass still goes through the shared pool rather than running on the
+    caller's thread: request threads are short-lived, so they would
+    initialise a fresh libtesseract handle every time, and the pool keeps
+    cascade traffic within OCR_MAX_WORKERS.
+    """
+    executor = get_executor()
+    tried = []
+    for name in order:
+        method, tesseract_config = STRATEGY_LOOKUP[name]
+        img = strategy_image(pipeline, method)
+        text, data, seconds = executor.submit(run_strategy, img, tesseract_config).result()
+        record_strategy(name, seconds)
+        score = mean_confidence(data)
+        tried.append((name, text, img, data, score))
+        if progress is not None:
+            progress(strategy_event(name, text, data))
+        if text.strip() and score >= threshold:
+            return tried[-1], len(tried)
+    
+    # Nothing was confident enough: keep the most confident non-empty result
+    valid_results = [result for result in tried if result[1].strip()]
+    best = max(valid_results, key=lambda x: x[4]) if valid_results else tried[0]
+    return best, len(tried)
+
+def parse_strategies(value):
+    """Parse a comma separated strategy list, raising ValueError on unknown names"""
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in STRATEGY_LOOKUP]
+    if unknown:
+        raise ValueError(f"Unknown strategies: {', '.join(unknown)}")
+    if not names:
+        raise ValueError('No strategies given')
+    return names
+
+def run_plan(pipeline, mode, names, threshold, progress=None, doc_class=None):
+    """Run a strategy plan on one image
+    
+    Returns (name, text, image, data, avg_confidence, strategies_run) for
+    the winning strategy, where image is what Tesseract saw and data its
+    image_to_data dict in that image's coordinates. progress receives a
+    strategy event as each strategy finishes. If doc_class is given and
+    every strategy ran, the outcome is added to the strategy statistics.
+    """
+    if mode == 'cascade':
+        (best_name, best_text, best_img, data, avg_confidence), strategies_run = run_cascade(pipeline, names, threshold, progress)
+        return best_name, best_text, best_img, data, avg_confidence, strategies_run
+    
+    # Preprocess once per method; each strategy is submitted as soon as its image is ready
+    jobs = (
+        (name, strategy_image(pipeline, STRATEGY_LOOKUP[name][0]), STRATEGY_LOOKUP[name][1])
+        for name in names
+    )
+    results = run_strategies(jobs, progress)
+    
+    # Select the longest non-empty result; its confidence data came from the same pass
+    valid_results = [result for result in results if result[1].strip()]
+    if valid_results:
+        best_name, best_text, best_img, data, _ = max(valid_results, key=lambda x: len(x[1]))
+    else:
+        best_name, best_text, best_img, data, _ = results[0]
+    
+    stats = strategy_stats.get_stats()
+    if doc_class is not None and stats is not None and len(results) == len(TESSERACT_STRATEGIES):
+        stats.record(doc_class, [(name, len(text.strip()), seconds) for name, text, _, _, seconds in results], best_name)
+    return best_name, best_text, best_img, data, mean_confidence(data), len(results)
+
+def find_band_cuts(gray, band_height, search):
+    """Return the row offsets that split an image into bands of roughly band_height
+    
+    Each cut is moved to the row with the least ink within search rows of
+    its target, so cuts fall between text lines wherever the page allows.
+    The final band is never shorter than half a band.
+    """
+    height = gray.shape[0]
+    ink = np.count_nonzero(gray < 128, axis=1)
+    # At least the target row itself is a candidate
+    search = max(1, search)
+    cuts = [0]
+    while height - cuts[-1] > band_height * 1.5:
+        target = cuts[-1] + band_height
+        low = max(cuts[-1] + band_height // 2, target - search)
+        high = min(height - band_height // 2, target + search)
+        window = ink[low:high]
+        candidates = np.flatnonzero(window == window.min()) + low
+        cuts.append(int(candidates[np.argmin(np.abs(candidates - target))]))
+    cuts.append(height)
+    return cuts
+
+def map_to_image(data, img, width, height, top=0):
+    """Map image_to_data boxes from the image Tesseract saw (img) onto a width x height original
+    
+    Preprocessed strategy images may be upscaled; top shifts the boxes of a
+    band down to its place in the full image.
+    """
+    img_width, img_height = img.size if isinstance(img, Image.Image) else (img.shape[1], img.shape[0])
+    scale_x, scale_y = width / img_width, height / img_height
+    if scale_x == scale_y == 1 and not top:
+        return data
+    
+    mapped = dict(data)
+    for column, scale, offset in (('left', scale_x, 0), ('width', scale_x, 0), ('top', scale_y, top), ('height', scale_y, 0)):
+        if column in data:
+            mapped[column] = [round(value * scale) + offset for value in data[column]]
+    return mapped
+
+def ocr_band(image, top, bottom, core_top, core_bottom, mode, names, threshold, progress=None):
+    """OCR one band and return (winning strategy, strategies_run, image_to_data rows)
+    
+    Only rows whose vertical centre lies in [core_top, core_bottom) are
+    kept, so text in the overlap between bands is reported once. Row boxes
+    are mapped back to the full image's coordinates.
+    """
+    band = image.crop((0, top, image.width, bottom))
+    name, _, img, data, _, strategies_run = run_plan(PreprocessPipeline(band), mode, names, threshold, progress)
+    data = map_to_image(data, img, band.width, band.height, top)
+    
+    rows = []
+    for i, level in enumerate(data.get('level', [])):
+        row = {column: values[i] for column, values in data.items()}
+        if level >= 2 and core_top <= row['top'] + row['height'] / 2 < core_bottom:
+            rows.append(row)
+    return name, strategies_run, rows
+
+def words_to_text(data):
+    """Rebuild plain text from image_to_data word rows: one line per line, a blank line between paragraphs"""
+    lines = []
+    current_line = current_par = None
+    for i, level in enumerate(data['level']):
+        word = str(data['text'][i]).strip()
+        if level != 5 or not word:
+            continue
+        par = (data['block_num'][i], data['par_num'][i])
+        line = (*par, data['line_num'][i])
+        if line != current_line:
+            if current_par is not None and par != current_par:
+                lines.append('')
+            lines.append(word)
+            current_line, current_par = line, par
+        else:
+            lines[-1] += ' ' + word
+    return '\n'.join(lines)
+
+def run_tiled(image, gray, mode, names, threshold, progress=None):
+    """OCR a tall image as overlapping horizontal bands on the band worker pool
+    
+    Only OCR_TILE_WORKERS bands are cropped and preprocessed at a time, so
+    peak memory follows the band size rather than the page size. Returns
+    (name, text, data, avg_confidence, strategies_run, bands) where name is
+    the strategy that won most bands and data has boxes in the original
+    image's coordinates. Strategy events passed to progress carry the band
+    index as 'tile'.
+    """
+    cuts = find_band_cuts(gray, config['OCR_TILE_HEIGHT'], config['OCR_TILE_SEARCH'])
+    overlap = config['OCR_TILE_OVERLAP']
+    executor = get_tile_executor()
+    futures = []
+    for index, (core_top, core_bottom) in enumerate(zip(cuts, cuts[1:])):
+        band_progress = None
+        if progress is not None:
+            band_progress = lambda event, index=index: progress({**event, 'tile': index})
+        # Run in a copy of this thread's context so band stages count towards the request's timings
+        futures.append(executor.submit(
+            contextvars.copy_context().run, ocr_band, image, max(0, core_top - overlap), min(image.height, core_bottom + overlap),
+            core_top, core_bottom, mode, names, threshold, band_progress
+        ))
+    
+    # Merge in reading order, renumbering blocks so they stay unique across bands
+    merged = []
+    winners = {}
+    strategies_run = 0
+    for future in futures:
+        name, run, rows = future.result()
+        block_offset = max((row['block_num'] for row in merged), default=0)
+        for row in rows:
+            row['block_num'] += block_offset
+        merged.extend(rows)
+        winners[name] = winners.get(name, 0) + 1
+        strategies_run += run
+    
+    page = {'level': 1, 'page_num': 1, 'block_num': 0, 'par_num': 0, 'line_num': 0, 'word_num': 0,
+            'left': 0, 'top': 0, 'width': image.width, 'height': image.height, 'conf': -1, 'text': ''}
+    columns = list(page)
+    data = {column: [row.get(column, page[column]) for row in [page] + merged] for column in columns}
+    best_name = max(winners, key=winners.get)
+    return best_name, words_to_text(data), data, mean_confidence(data), strategies_run, len(futures)
+
+def extract_text(image_file, mode=None, strategies=None, min_confidence=None, progress=None):
+    """Extract text from image using Tesseract OCR with enhanced configuration
+    
+    image_file is a path, a binary file object or a PIL image. mode,
+    strategies and min_confidence override OCR_MODE, the strategy plan
+    (OCR_CASCADE_ORDER in cascade mode, all strategies otherwise) and
+    OCR_CASCADE_THRESHOLD for a single call. Pruned mode runs the plan
+    without the strategies that rarely win for the image's
+    'document_class', listing them as 'pruned' (see strategy_stats.py);
+    full-plan runs feed those statistics. Neither applies to tiled
+    images. Images taller than
+    OCR_TILE_MIN_HEIGHT are OCR'd in bands (see run_tiled) and report the
+    band count as 'tiles'. Word boxes in the 'confidence' image_to_data
+    dict are in the original image's coordinates, whose [width, height] is
+    'size'. Results are cached by image content, plan and backend;
+    the 'cache' field reports 'hit' or 'miss'. progress, if given, is called
+    with a strategy event as each strategy finishes, possibly from a worker
+    thread; cache hits produce none.
+    """
+    mode = mode or config['OCR_MODE']
+    if mode == 'cascade':
+        names = strategies or config['OCR_CASCADE_ORDER']
+        threshold = config['OCR_CASCADE_THRESHOLD'] if min_confidence is None else min_confidence
+    else:
+        names = strategies or [name for name, _, _ in TESSERACT_STRATEGIES]
+        threshold = None
+    tile_settings = [config[key] for key in ('OCR_TILE_MIN_HEIGHT', 'OCR_TILE_HEIGHT', 'OCR_TILE_SEARCH', 'OCR_TILE_OVERLAP')]
+    
+    try:
+        cache = get_cache()
+        if cache is not None:
+            # The C API and the tesseract binary can be different builds and disagree
+            key = make_key(
+                image_file, 'tesseract', mode=mode, threshold=threshold, backend=active_backend(),
+                plan=[(name, *STRATEGY_LOOKUP[name]) for name in names], tiling=tile_settings
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                cached['cache'] = 'hit'
+                return metrics.count_result('tesseract', cached)
+        
+        image = image_file if isinstance(image_file, Image.Image) else Image.open(image_file)
+        tiles = doc_class = pruned = None
+        if config['OCR_TILE_MIN_HEIGHT'] and image.height > config['OCR_TILE_MIN_HEIGHT']:
+            gray = PreprocessPipeline(image).gray
+            best_name, best_text, data, avg_confidence, strategies_run, tiles = run_tiled(image, gray, mode, names, threshold, progress)
+        else:
+            pipeline = PreprocessPipeline(image)
+            plan = names
+            stats = strategy_stats.get_stats()
+            full_plan = len(names) == len(TESSERACT_STRATEGIES)
+            if stats is not None and (mode == 'pruned' or (mode == 'all' and full_plan and strategy_stats.sampled())):
+                with metrics.stage('classify'):
+                    doc_class = strategy_stats.document_class(pipeline.gray)
+                if mode == 'pruned':
+                    plan, pruned = stats.prune(doc_class, names)
+            best_name, best_text, best_img, data, avg_confidence, strategies_run = run_plan(pipeline, mode, plan, threshold, progress, doc_class)
+            data = map_to_image(data, best_img, image.width, image.height)
+            gray = pipeline.gray
+        
+        with metrics.stage('regions'):
+            text_regions = detect_text_regions(gray)
+        
+        result = {
+            'text': best_text.strip(),
+            'confidence': data,
+            'regions': text_regions,
+            'avg_confidence': round(avg_confidence, 2),
+            'method_used': best_name,
+            'strategies_run': strategies_run,
+            'size': [image.width, image.height],
+            'success': True
+        }
+        if tiles is not None:
+            result['tiles'] = tiles
+        if doc_class is not None:
+            result['document_class'] = doc_class
+        if pruned is not None:
+            result['pruned'] = pruned
+        if cache is not None:
+            cache.put(key, result)
+            result['cache'] = 'miss'
+        metrics.inc('ocr_strategy_wins_total', strategy=best_name)
+        return metrics.count_result('tesseract', result)
+    except Exception as e:
+        return metrics.count_result('tesseract', {
+            'text': '',
+            'error': str(e),
+            'success': False
+        })
+
+if __name__ == '__main__':
+    # Serve the unified OCRify app with Tesseract preselected
+    from ocrify import run_server
+    run_server(default_engine='tesseract')
\ No newline at end of file
@@ -0,0 +1,265 @@
+"""Benchmark extract_text and extract_text_easyocr over an image corpus
+
+Usage: python -m ocrify bench [image or directory ...] [--config NAME ...] [--output FILE] [--baseline FILE]
+   or: python benchmarks/ocr_bench.py ...
+
+Each configuration runs in a fresh process, so its peak RSS and model load
+are its own. Per image it records latency, CPU seconds (including
+tesseract subprocesses), the process's peak RSS so far and, when a
+<name>.gt.txt ground truth file sits next to the image, the character
+error rate. Results are written as JSON; with --baseline the run is
+compared against an earlier one and the command exits with status 1 on a
+speed or accuracy regression. Defaults to the sample screenshots in images/.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    # Windows: CPU time comes from os.times() without children, and peak RSS is not reported
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Only needed when run as a script; `python -m ocrify bench` already has the root on the path
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+DEFAULT_IMAGES = os.path.join(ROOT, 'images')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff')
+GROUND_TRUTH_SUFFIX = '.gt.txt'
+
+# name: (engine, extract keyword arguments, engine module config overrides)
+CONFIGS = {
+    'tesseract': ('tesseract', {'mode': 'all'}, {}),
+    'tesseract-cascade': ('tesseract', {'mode': 'cascade'}, {}),
+    'tesseract-subprocess': ('tesseract', {'mode': 'all'}, {'OCR_BACKEND': 'subprocess'}),
+    'easyocr': ('easyocr', {}, {}),
+}
+DEFAULT_CONFIGS = ['tesseract', 'tesseract-cascade', 'easyocr']
+
+def find_images(paths):
+    """Expand files, directories and globs into a sorted list of image paths"""
+    images = []
+    for path in paths:
+        if os.path.isdir(path):
+            candidates = glob.glob(os.path.join(path, '*'))
+        else:
+            candidates = glob.glob(path) or [path]
+        images.extend(candidate for candidate in candidates if candidate.lower().endswith(IMAGE_EXTENSIONS))
+    return sorted(set(images))
+
+def ground_truth(path):
+    """The text of <image stem>.gt.txt next to the image, or None"""
+    truth_path = os.path.splitext(path)[0] + GROUND_TRUTH_SUFFIX
+    if not os.path.exists(truth_path):
+        return None
+    with open(truth_path, encoding='utf-8') as f:
+        return f.read()
+
+def normalise_text(text):
+    # Line breaks and spacing differ between engines; compare the words and punctuation
+    return re.sub(r'\s+', ' ', text).strip()
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+def character_error_rate(text, truth):
+    truth = normalise_text(truth)
+    return round(edit_distance(normalise_text(text), truth) / max(1, len(truth)), 4)
+
+def cpu_seconds():
+    if resource is None:
+        times = os.times()
+        return times.user + times.system
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return self_usage.ru_utime + self_usage.ru_stime + children.ru_utime + children.ru_stime
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def percentile(values, fraction):
+    """Linearly interpolated percentile of a non-empty list"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+def load_extract(name):
+    """Apply a configuration's overrides and return extract(path) for it"""
+    engine, kwargs, overrides = CONFIGS[name]
+    import ocr_cache
+    
+    # Every run must do the OCR work, not answer from the cache
+    ocr_cache.config['OCR_CACHE_ENABLED'] = False
+    if engine == 'tesseract':
+        import Tesseract
+        
+        Tesseract.config.update(overrides)
+        return lambda path: Tesseract.extract_text(path, **kwargs)
+    import EasyOCR
+    
+    EasyOCR.config.update(overrides)
+    return lambda path: EasyOCR.extract_text_easyocr(path, **kwargs)
+
+def run_config(name, paths, repeat, warmup):
+    """Benchmark one configuration over the corpus; runs in its own process"""
+    extract = load_extract(name)
+    started = time.perf_counter()
+    if warmup and paths:
+        extract(paths[0])
+    warmup_seconds = time.perf_counter() - started
+    
+    images = []
+    wall_started = time.perf_counter()
+    for path in paths:
+        latencies, cpu = [], []
+        for _ in range(repeat):
+            cpu_started = cpu_seconds()
+            call_started = time.perf_counter()
+            result = extract(path)
+            latencies.append(time.perf_counter() - call_started)
+            cpu.append(cpu_seconds() - cpu_started)
+        truth = ground_truth(path)
+        images.append({
+            'image': os.path.relpath(path),
+            'success': result['success'],
+            'error': result.get('error'),
+            'latency_seconds': [round(latency, 4) for latency in latencies],
+            'cpu_seconds': round(sum(cpu) / len(cpu), 4),
+            'peak_rss_mb': peak_rss_mb(),
+            'chars': len(result.get('text', '')),
+            'cer': character_error_rate(result.get('text', ''), truth) if truth is not None else None,
+        })
+    wall = time.perf_counter() - wall_started
+    return {'warmup_seconds': round(warmup_seconds, 3), 'wall_seconds': round(wall, 3), 'images': images}
+
+def summarise(run):
+    latencies = [latency for image in run['images'] for latency in image['latency_seconds']]
+    rates = [image['cer'] for image in run['images'] if image['cer'] is not None]
+    summary = {
+        'images': len(run['images']),
+        'failures': sum(not image['success'] for image in run['images']),
+        'throughput_per_second': round(len(latencies) / run['wall_seconds'], 3) if run['wall_seconds'] else None,
+        'peak_rss_mb': max((image['peak_rss_mb'] for image in run['images'] if image['peak_rss_mb'] is not None), default=None),
+        'cpu_seconds_per_image': round(sum(image['cpu_seconds'] for image in run['images']) / len(run['images']), 4) if run['images'] else None,
+        'cer': round(sum(rates) / len(rates), 4) if rates else None,
+    }
+    for label, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+        summary[f'{label}_seconds'] = round(percentile(latencies, fraction), 4) if latencies else None
+    return summary
+
+def compare(results, baseline, max_slowdown, max_cer_increase):
+    """Return a message per regression of results against a baseline run"""
+    regressions = []
+    for name, run in results['configs'].items():
+        before = baseline.get('configs', {}).get(name)
+        if before is None:
+            continue
+        now, then = run['summary'], before['summary']
+        if now['p50_seconds'] and then['p50_seconds'] and now['p50_seconds'] > then['p50_seconds'] * (1 + max_slowdown):
+            regressions.append(f"{name}: p50 {then['p50_seconds']}s -> {now['p50_seconds']}s")
+        if now['cer'] is not None and then['cer'] is not None and now['cer'] > then['cer'] + max_cer_increase:
+            regressions.append(f"{name}: CER {then['cer']} -> {now['cer']}")
+        if now['failures'] > then['failures']:
+            regressions.append(f"{name}: failures {then['failures']} -> {now['failures']}")
+    return regressions
+
+def format_value(value, spec):
+    return format(value, spec) if value is not None else '-'
+
+def print_table(results):
+    print(f"{'config':<22} {'images':>6} {'img/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'cpu/img':>8} {'rss MB':>8} {'CER':>7}")
+    for name, run in results['configs'].items():
+        summary = run['summary']
+        print(
+            f"{name:<22} {summary['images']:>6} {format_value(summary['throughput_per_second'], '.2f'):>7} "
+            f"{format_value(summary['p50_seconds'], '.3f'):>8} {format_value(summary['p95_seconds'], '.3f'):>8} "
+            f"{format_value(summary['p99_seconds'], '.3f'):>8} {format_value(summary['cpu_seconds_per_image'], '.3f'):>8} "
+            f"{format_value(summary['peak_rss_mb'], '.1f'):>8} {format_value(summary['cer'], '.4f'):>7}"
+        )
+
+def add_arguments(parser):
+    parser.add_argument('images', nargs='*', help=f'images, directories or globs (default: {os.path.relpath(DEFAULT_IMAGES)})')
+    parser.add_argument('--config', action='append', choices=sorted(CONFIGS), dest='configs',
+                        help=f"configuration to run, repeatable (default: {', '.join(DEFAULT_CONFIGS)})")
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per image (default: 3)')
+    parser.add_argument('--no-warmup', action='store_false', dest='warmup', help='time the first call too, model loading included')
+    parser.add_argument('--output', default='bench.json', help='JSON results file (default: bench.json)')
+    parser.add_argument('--baseline', help='earlier results file to check for regressions')
+    parser.add_argument('--max-slowdown', type=float, default=0.10, help='allowed p50 latency increase as a fraction (default: 0.10)')
+    parser.add_argument('--max-cer-increase', type=float, default=0.005, help='allowed mean CER increase (default: 0.005)')
+
+def run(args):
+    """Run the benchmark described by parsed add_arguments options; returns the exit status"""
+    paths = find_images(args.images or [DEFAULT_IMAGES])
+    if not paths:
+        print('No images found', file=sys.stderr)
+        return 2
+    repeat = max(1, args.repeat)
+    
+    results = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'host': {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'repeat': repeat,
+        'configs': {},
+    }
+    # spawn, not fork: each configuration starts from a clean interpreter
+    context = multiprocessing.get_context('spawn')
+    for name in args.configs or DEFAULT_CONFIGS:
+        print(f'Running {name} on {len(paths)} images...', file=sys.stderr)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            config_run = executor.submit(run_config, name, paths, repeat, args.warmup).result()
+        engine, kwargs, overrides = CONFIGS[name]
+        results['configs'][name] = {
+            'engine': engine,
+            'options': kwargs,
+            'overrides': overrides,
+            'summary': summarise(config_run),
+            **config_run,
+        }
+    
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print_table(results)
+    print(f'Results written to {args.output}', file=sys.stderr)
+    
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.max_slowdown, args.max_cer_increase)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            return 1
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    sys.exit(run(parser.parse_args(argv)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""Bulk OCR from the command line: `python -m ocrify run <glob> ... --engine NAME -j N`
+
+Files are OCR'd by a pool of N worker processes that each read, decode
+and OCR whole files, so only paths and results cross process boundaries.
+Results come back through a bounded window of in-flight files and a single
+writer appends them to a JSONL file in input order. The output doubles as
+the checkpoint: --resume skips every file already in it (dropping a line
+cut short by a crash), so an interrupted run picks up where it stopped.
+"""
+import glob
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import formats
+import ocr_cache
+import pages
+import serving
+import Tesseract
+from engines import ENGINES
+
+config = {
+    'BULK_IN_FLIGHT_PER_WORKER': 2,  # files queued ahead of each worker
+    'BULK_FSYNC_EVERY': 100,  # records between fsyncs of the output file
+    'BULK_PROGRESS_EVERY': 100,  # records between progress lines on stderr
+}
+
+EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tif', '.tiff', '.pdf')
+
+# Set in each worker process by init_worker
+_engine = None
+_options = None
+
+def add_arguments(parser):
+    parser.add_argument('inputs', nargs='+', help="files, directories or globs (quote them; '**' recurses)")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='tesseract')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='worker processes (default: CPUs)')
+    parser.add_argument('-o', '--output', default='ocr_results.jsonl', help="JSONL output, '-' for stdout (default: ocr_results.jsonl)")
+    parser.add_argument('--resume', action='store_true', help='skip files already in the output and append to it')
+    parser.add_argument('--compute-threads', type=int, help='torch/OpenCV/OpenMP threads per worker (default: CPUs / jobs)')
+    parser.add_argument('--mode', help='Tesseract mode (all, cascade or pruned)')
+    parser.add_argument('--strategies', help='Tesseract strategies, comma separated')
+    parser.add_argument('--min-confidence', help='Tesseract cascade stop threshold')
+    parser.add_argument('--languages', help='EasyOCR languages, comma separated')
+
+def find_files(inputs):
+    """Expand files, directories and globs into a sorted, de-duplicated list of OCR-able paths"""
+    paths = set()
+    for entry in inputs:
+        if os.path.isdir(entry):
+            candidates = glob.iglob(os.path.join(entry, '**', '*'), recursive=True)
+        else:
+            candidates = glob.iglob(entry, recursive=True) if glob.has_magic(entry) else [entry]
+        paths.update(path for path in candidates if path.lower().endswith(EXTENSIONS) and os.path.isfile(path))
+    return sorted(paths)
+
+def read_checkpoint(output):
+    """Return the paths already written to output, truncating a trailing partial line"""
+    done = set()
+    good_size = 0
+    with open(output, 'rb+') as f:
+        for line in f:
+            # A last line without its newline was cut short, even if it parses
+            if not line.endswith(b'\n'):
+                break
+            try:
+                done.add(json.loads(line)['path'])
+            except (ValueError, KeyError):
+                break
+            good_size += len(line)
+        f.truncate(good_size)
+    return done
+
+def init_worker(engine_name, form, threads):
+    global _engine, _options
+    # Ctrl-C is handled by the parent, which stops handing out files and closes the output
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    serving.limit_threads(threads)
+    # The workers already share the CPUs; each runs its strategies on its own threads only
+    Tesseract.config['OCR_MAX_WORKERS'] = threads
+    # Every file is seen once, so hashing uploads for the cache would be wasted work
+    ocr_cache.config['OCR_CACHE_ENABLED'] = False
+    _engine = ENGINES[engine_name]
+    _options = _engine.parse_options(form)
+
+def record(engine, path, result):
+    if not result['success']:
+        return {'path': path, 'error': result['error'], 'success': False}
+    return {'path': path, 'text': result['text'], **engine.response(result), 'success': True}
+
+def ocr_file(path):
+    """OCR one file in a worker process and return its JSONL record"""
+    started = time.perf_counter()
+    try:
+        with open(path, 'rb') as stream:
+            if pages.is_document(stream):
+                page_records = [
+                    {'page': number, **record(_engine, path, _engine.extract_image(image, _options))}
+                    for number, image in pages.iter_pages(stream)
+                ]
+                for page in page_records:
+                    del page['path']
+                body = {
+                    'path': path,
+                    'text': '\n\n'.join(page['text'] for page in page_records if page['success']),
+                    'pages': page_records,
+                    'success': all(page['success'] for page in page_records),
+                }
+            else:
+                body = record(_engine, path, _engine.extract(stream, _options))
+    except Exception as e:
+        body = {'path': path, 'error': str(e), 'success': False}
+    body['seconds'] = round(time.perf_counter() - started, 3)
+    return body
+
+def encode_line(body):
+    line = formats.dumps(body)
+    # orjson returns bytes, the json fallback str
+    return (line if isinstance(line, bytes) else line.encode()) + b'\n'
+
+def iter_results(executor, paths, in_flight):
+    """Yield each path's record in input order, keeping at most in_flight files queued or running"""
+    pending = deque()
+    try:
+        for path in paths:
+            pending.append(executor.submit(ocr_file, path))
+            if len(pending) >= in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+def run(args):
+    """Run a bulk OCR job from parsed add_arguments options; returns the exit status"""
+    form = {key: value for key, value in (
+        ('mode', args.mode), ('strategies', args.strategies),
+        ('min_confidence', args.min_confidence), ('languages', args.languages),
+    ) if value}
+    try:
+        ENGINES[args.engine].parse_options(form)
+    except ValueError as e:
+        print(f'Invalid options: {e}', file=sys.stderr)
+        return 2
+    
+    paths = find_files(args.inputs)
+    to_stdout = args.output == '-'
+    if args.resume and to_stdout:
+        print('--resume needs an output file', file=sys.stderr)
+        return 2
+    if not to_stdout and os.path.exists(args.output) and os.path.getsize(args.output) and not args.resume:
+        print(f'{args.output} already has results; pass --resume to continue it or remove it', file=sys.stderr)
+        return 2
+    done = read_checkpoint(args.output) if args.resume and os.path.exists(args.output) else set()
+    remaining = [path for path in paths if path not in done]
+    print(f'{len(paths)} files, {len(paths) - len(remaining)} already done, {len(remaining)} to OCR', file=sys.stderr)
+    if not remaining:
+        return 0
+    
+    if to_stdout:
+        out = sys.stdout.buffer
+        # The engines print their model loading progress; keep it out of the JSONL
+        sys.stdout = sys.stderr
+    else:
+        out = open(args.output, 'ab')
+    jobs = max(1, args.jobs)
+    threads = serving.compute_threads(jobs, args.compute_threads)
+    # Fork where possible so models preloaded here are shared copy-on-write by the workers
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+    if context.get_start_method() == 'fork':
+        serving.preload(ENGINES, [args.engine])
+    executor = ProcessPoolExecutor(jobs, mp_context=context, initializer=init_worker, initargs=(args.engine, form, threads))
+    
+    written = failed = 0
+    started = time.perf_counter()
+    try:
+        for body in iter_results(executor, remaining, jobs * config['BULK_IN_FLIGHT_PER_WORKER']):
+            out.write(encode_line(body))
+            out.flush()
+            written += 1
+            failed += not body['success']
+            if not to_stdout and written % config['BULK_FSYNC_EVERY'] == 0:
+                os.fsync(out.fileno())
+            if written % config['BULK_PROGRESS_EVERY'] == 0:
+                rate = written / (time.perf_counter() - started)
+                print(f'{written}/{len(remaining)} files, {failed} failed, {rate:.2f} files/s', file=sys.stderr)
+    except KeyboardInterrupt:
+        print(f'Interrupted after {written} files; rerun with --resume to continue', file=sys.stderr)
+        return 130
+    finally:
+        # Drop the queued files; the ones already running finish but are not written
+        executor.shutdown(cancel_futures=True)
+        if not to_stdout:
+            out.close()
+    
+    print(f'Done: {written} files, {failed} failed in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+    return 1 if failed else 0
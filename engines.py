@@ -0,0 +1,246 @@
+"""OCR engines behind one interface, selected per request by the OCRify service
+
+Each engine wraps a backend module (Tesseract.py or EasyOCR.py). Engines are
+created once per process, so the strategy worker pool, the EasyOCR reader pool
+and the result cache are shared by every request and background job.
+"""
+import logging
+import threading
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+import Tesseract
+import EasyOCR
+import formats
+import metrics
+import routing
+import strategy_stats
+
+logger = logging.getLogger(__name__)
+
+class OCREngine:
+    """Base class for OCR backends"""
+    
+    name = None
+    
+    def parse_options(self, form):
+        """Read engine options from a request form, raising ValueError on bad input"""
+        return {}
+    
+    def extract(self, stream, options, progress=None):
+        """OCR one uploaded image (a binary file object) and return the backend's result dict
+        
+        progress, if given, is called with event dicts (possibly from worker
+        threads) as partial results become available.
+        """
+        raise NotImplementedError
+    
+    def extract_image(self, image, options, progress=None):
+        """OCR one decoded PIL image (L or RGB), such as a page of a document"""
+        raise NotImplementedError
+    
+    def extract_batch(self, streams, options):
+        """OCR several uploads, returning one result dict per stream in order"""
+        return [self.extract(stream, options) for stream in streams]
+    
+    def response(self, result):
+        """Engine-specific response fields for a successful result"""
+        return {}
+    
+    def lines(self, result):
+        """Text lines of a successful result with their words, boxes and confidences (see formats.py)"""
+        raise NotImplementedError
+    
+    def status(self):
+        return {}
+    
+    def warmup(self, force=False):
+        """Load models ahead of the first request if the engine's config asks for it, or always with force"""
+
+class TesseractEngine(OCREngine):
+    name = 'tesseract'
+    
+    def parse_options(self, form):
+        mode = form.get('mode') or None
+        if mode is not None and mode not in Tesseract.OCR_MODES:
+            raise ValueError(f'Invalid mode: {mode}')
+        strategies = Tesseract.parse_strategies(form['strategies']) if form.get('strategies') else None
+        min_confidence = float(form['min_confidence']) if form.get('min_confidence') else None
+        return {'mode': mode, 'strategies': strategies, 'min_confidence': min_confidence}
+    
+    def extract(self, stream, options, progress=None):
+        stream.seek(0)
+        return Tesseract.extract_text(stream, **options, progress=progress)
+    
+    def extract_image(self, image, options, progress=None):
+        return Tesseract.extract_text(image, **options, progress=progress)
+    
+    def response(self, result):
+        response = {
+            'regions_count': len(result['regions']),
+            'avg_confidence': result.get('avg_confidence', 0),
+            'method_used': result['method_used'],
+            'strategies_run': result['strategies_run'],
+        }
+        # Only set for tiled images and classified (pruned or sampled) runs
+        for key in ('tiles', 'document_class', 'pruned'):
+            if key in result:
+                response[key] = result[key]
+        return response
+    
+    def lines(self, result):
+        return formats.lines_from_tesseract_data(result['confidence'])
+    
+    def status(self):
+        status = {key: Tesseract.config[key] for key in ('OCR_MODE', 'OCR_EXECUTOR', 'OCR_MAX_WORKERS', 'OCR_BACKEND')}
+        try:
+            status['backend'] = Tesseract.active_backend()
+        except (OSError, ValueError) as e:
+            status['backend_error'] = str(e)
+        stats = strategy_stats.get_stats()
+        status['strategy_stats'] = stats.report() if stats is not None else None
+        return status
+    
+    def warmup(self, force=False):
+        if force:
+            # Map libtesseract now; the C API handles themselves are per thread
+            Tesseract.active_backend()
+
+class EasyOCREngine(OCREngine):
+    name = 'easyocr'
+    
+    def parse_options(self, form):
+        languages = EasyOCR.parse_languages(form['languages']) if form.get('languages') else None
+        try:
+            batch_size = int(form['batch_size']) if form.get('batch_size') else None
+        except ValueError:
+            raise ValueError('batch_size must be an integer')
+        return {'languages': languages, 'batch_size': batch_size}
+    
+    def extract(self, stream, options, progress=None):
+        return EasyOCR.extract_text_easyocr(self._decode(stream), languages=options['languages'], progress=progress)
+    
+    def extract_image(self, image, options, progress=None):
+        bgr = cv2.cvtColor(np.asarray(image.convert('RGB')), cv2.COLOR_RGB2BGR)
+        return EasyOCR.extract_text_easyocr(bgr, languages=options['languages'], progress=progress)
+    
+    def extract_batch(self, streams, options):
+        images = [self._decode(stream) for stream in streams]
+        return EasyOCR.extract_text_easyocr_batch(images, batch_size=options['batch_size'], languages=options['languages'])
+    
+    def response(self, result):
+        return {
+            'detections': result.get('detections', 0),
+            'confidence': result.get('confidence', 0),
+            'char_count': result.get('char_count', 0),
+        }
+    
+    def lines(self, result):
+        return formats.lines_from_detections(result.get('boxes', []))
+    
+    def status(self):
+        return EasyOCR.reader_status()
+    
+    def warmup(self, force=False):
+        if force or EasyOCR.config['EASYOCR_WARMUP']:
+            EasyOCR.warmup_reader()
+    
+    def _decode(self, stream):
+        # Decode straight from the in-memory (or spooled) upload, never from a saved copy
+        stream.seek(0)
+        with metrics.stage('decode', engine='easyocr'):
+            return cv2.imdecode(np.frombuffer(stream.read(), np.uint8), cv2.IMREAD_COLOR)
+
+class AutoEngine(OCREngine):
+    """Routes each image to Tesseract or EasyOCR using the cheap features in routing.py
+    
+    Images that look like clean documents go to Tesseract first and are
+    retried with EasyOCR only when Tesseract's confidence comes back below
+    AUTO_ESCALATE_CONFIDENCE; everything else goes straight to EasyOCR.
+    """
+    
+    name = 'auto'
+    
+    def __init__(self, tesseract, easyocr):
+        self.tesseract = tesseract
+        self.easyocr = easyocr
+        self.routed = {'tesseract': 0, 'easyocr': 0, 'escalated': 0}
+        self._lock = threading.Lock()
+    
+    def parse_options(self, form):
+        return {'tesseract': self.tesseract.parse_options(form), 'easyocr': self.easyocr.parse_options(form)}
+    
+    def extract(self, stream, options, progress=None):
+        # Decode once with PIL (which also reads GIFs) and share the pixels between both engines
+        stream.seek(0)
+        return self.extract_image(Image.open(stream), options, progress)
+    
+    def extract_image(self, image, options, progress=None):
+        started = time.perf_counter()
+        image = image.convert('RGB')
+        rgb = np.asarray(image)
+        with metrics.stage('routing'):
+            features = routing.image_features(cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY))
+            engine_name, reason = routing.choose_engine(features)
+        decision = {
+            'features': features,
+            'first_choice': engine_name,
+            'reason': reason,
+            'feature_ms': round((time.perf_counter() - started) * 1000, 2),
+            'escalated': False,
+        }
+        if progress is not None:
+            progress({'event': 'routing', 'engine': engine_name, 'reason': reason, 'features': features})
+        
+        if engine_name == 'tesseract':
+            tesseract_started = time.perf_counter()
+            result = Tesseract.extract_text(image, **options['tesseract'], progress=progress)
+            decision['tesseract_ms'] = round((time.perf_counter() - tesseract_started) * 1000, 2)
+            if routing.should_escalate(result):
+                decision['escalated'] = True
+                decision['tesseract_confidence'] = result.get('avg_confidence', 0)
+                engine_name = 'easyocr'
+                if progress is not None:
+                    progress({'event': 'routing', 'engine': engine_name, 'reason': 'low tesseract confidence', 'features': features})
+        
+        if engine_name == 'easyocr':
+            easyocr_started = time.perf_counter()
+            result = EasyOCR.extract_text_easyocr(
+                cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR), languages=options['easyocr']['languages'], progress=progress
+            )
+            decision['easyocr_ms'] = round((time.perf_counter() - easyocr_started) * 1000, 2)
+        
+        decision['total_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        with self._lock:
+            self.routed[engine_name] += 1
+            self.routed['escalated'] += decision['escalated']
+        metrics.inc('ocr_auto_routed_total', engine=engine_name, escalated=str(decision['escalated']).lower())
+        logger.info('auto routing: engine=%s %s', engine_name, decision)
+        
+        result['engine_used'] = engine_name
+        result['routing'] = decision
+        return result
+    
+    def response(self, result):
+        return {'engine_used': result['engine_used'], 'routing': result['routing'], **self._engine_used(result).response(result)}
+    
+    def lines(self, result):
+        return self._engine_used(result).lines(result)
+    
+    def status(self):
+        with self._lock:
+            routed = dict(self.routed)
+        return {'routed': routed, 'thresholds': dict(routing.config)}
+    
+    def _engine_used(self, result):
+        return self.tesseract if result['engine_used'] == 'tesseract' else self.easyocr
+
+_tesseract_engine = TesseractEngine()
+_easyocr_engine = EasyOCREngine()
+ENGINES = {
+    engine.name: engine
+    for engine in (_tesseract_engine, _easyocr_engine, AutoEngine(_tesseract_engine, _easyocr_engine))
+}
@@ -0,0 +1,180 @@
+"""Output formats for /api/v1/ocr: plain text, lines, words with boxes, hOCR and ALTO XML
+
+Engines describe a page as a list of lines (see lines_from_tesseract_data
+and lines_from_detections); each format renders only what it needs from
+them. Boxes are [x0, y0, x1, y1] pixels in the original image and
+confidences are percentages, as in the /upload responses.
+"""
+import json
+from collections import OrderedDict
+from xml.sax.saxutils import escape, quoteattr
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+OUTPUTS = ('text', 'lines', 'words', 'hocr', 'alto')
+XML_OUTPUTS = {'hocr': 'application/xhtml+xml', 'alto': 'application/xml'}
+
+def dumps(body):
+    """Serialise a JSON response body, with orjson when it is installed
+    
+    Word lists of large pages run to tens of thousands of boxes, where the
+    standard library encoder dominates the response time.
+    """
+    if orjson is not None:
+        return orjson.dumps(body, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(body)
+
+def bounding_box(boxes):
+    return [min(box[0] for box in boxes), min(box[1] for box in boxes), max(box[2] for box in boxes), max(box[3] for box in boxes)]
+
+def mean(values):
+    return round(sum(values) / len(values), 2) if values else 0
+
+def lines_from_tesseract_data(data):
+    """Group image_to_data word rows into lines, keeping Tesseract's block and paragraph numbers"""
+    lines = OrderedDict()
+    for i, level in enumerate(data.get('level', [])):
+        text = str(data['text'][i]).strip()
+        if level != 5 or not text:
+            continue
+        left, top = int(data['left'][i]), int(data['top'][i])
+        word = {
+            'text': text,
+            'confidence': round(max(float(data['conf'][i]), 0), 2),
+            'box': [left, top, left + int(data['width'][i]), top + int(data['height'][i])],
+        }
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        lines.setdefault(key, []).append(word)
+    
+    return [
+        {
+            'block': block,
+            'par': par,
+            'text': ' '.join(word['text'] for word in words),
+            'confidence': mean([word['confidence'] for word in words]),
+            'box': bounding_box([word['box'] for word in words]),
+            'words': words,
+        }
+        for (block, par, _), words in lines.items()
+    ]
+
+def lines_from_detections(boxes):
+    """Turn EasyOCR detections (see EasyOCR.detection_box) into lines of one word each
+    
+    EasyOCR reads a text box as a whole, so each detection is its own
+    block, line and word.
+    """
+    lines = []
+    for number, detection in enumerate(boxes, 1):
+        xs = [point[0] for point in detection['box']]
+        ys = [point[1] for point in detection['box']]
+        word = {
+            'text': detection['text'],
+            'confidence': detection['confidence'],
+            'box': [round(min(xs)), round(min(ys)), round(max(xs)), round(max(ys))],
+        }
+        lines.append({'block': number, 'par': 1, **word, 'words': [word]})
+    return lines
+
+def render_lines(lines):
+    return [{key: line[key] for key in ('text', 'confidence', 'box')} for line in lines]
+
+def render_words(lines):
+    return [word for line in lines for word in line['words']]
+
+def group_blocks(lines):
+    """Yield (block, [(par, [lines])]) in reading order"""
+    blocks = OrderedDict()
+    for line in lines:
+        blocks.setdefault(line['block'], OrderedDict()).setdefault(line['par'], []).append(line)
+    for block, pars in blocks.items():
+        yield block, list(pars.items())
+
+def hocr_bbox(box):
+    return 'bbox {} {} {} {}'.format(*box)
+
+def render_hocr(pages, engine):
+    """Render [(page number, (width, height), lines)] as one hOCR 1.2 document"""
+    out = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">\n'
+        '<html xmlns="http://www.w3.org/1999/xhtml" xml:lang="en" lang="en">\n'
+        ' <head>\n'
+        '  <title></title>\n'
+        '  <meta http-equiv="Content-Type" content="text/html;charset=utf-8"/>\n'
+        f'  <meta name="ocr-system" content={quoteattr("ocrify " + engine)}/>\n'
+        '  <meta name="ocr-capabilities" content="ocr_page ocr_carea ocr_par ocr_line ocrx_word ocrp_wconf"/>\n'
+        ' </head>\n'
+        ' <body>\n'
+    ]
+    for number, (width, height), lines in pages:
+        out.append(f'  <div class="ocr_page" id="page_{number}" title="{hocr_bbox([0, 0, width, height])}; ppageno {number - 1}">\n')
+        word_id = line_id = 0
+        for block, pars in group_blocks(lines):
+            block_lines = [line for _, par_lines in pars for line in par_lines]
+            out.append(f'   <div class="ocr_carea" id="block_{number}_{block}" title="{hocr_bbox(bounding_box([line["box"] for line in block_lines]))}">\n')
+            for par, par_lines in pars:
+                out.append(f'    <p class="ocr_par" id="par_{number}_{block}_{par}" title="{hocr_bbox(bounding_box([line["box"] for line in par_lines]))}">\n')
+                for line in par_lines:
+                    line_id += 1
+                    out.append(f'     <span class="ocr_line" id="line_{number}_{line_id}" title="{hocr_bbox(line["box"])}">')
+                    for word in line['words']:
+                        word_id += 1
+                        out.append(
+                            f'<span class="ocrx_word" id="word_{number}_{word_id}" '
+                            f'title="{hocr_bbox(word["box"])}; x_wconf {round(word["confidence"])}">{escape(word["text"])}</span> '
+                        )
+                    out.append('</span>\n')
+                out.append('    </p>\n')
+            out.append('   </div>\n')
+        out.append('  </div>\n')
+    out.append(' </body>\n</html>\n')
+    return ''.join(out)
+
+def alto_position(box):
+    x0, y0, x1, y1 = box
+    return f'HPOS="{x0}" VPOS="{y0}" WIDTH="{x1 - x0}" HEIGHT="{y1 - y0}"'
+
+def render_alto(pages, engine):
+    """Render [(page number, (width, height), lines)] as one ALTO v4 document"""
+    out = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<alto xmlns="http://www.loc.gov/standards/alto/ns-v4#" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+        'xsi:schemaLocation="http://www.loc.gov/standards/alto/ns-v4# http://www.loc.gov/alto/v4/alto-4-2.xsd">\n'
+        ' <Description>\n'
+        '  <MeasurementUnit>pixel</MeasurementUnit>\n'
+        '  <OCRProcessing ID="OCR_0"><ocrProcessingStep><processingSoftware>'
+        f'<softwareName>{escape("ocrify " + engine)}</softwareName>'
+        '</processingSoftware></ocrProcessingStep></OCRProcessing>\n'
+        ' </Description>\n'
+        ' <Layout>\n'
+    ]
+    for number, (width, height), lines in pages:
+        out.append(f'  <Page ID="page_{number}" PHYSICAL_IMG_NR="{number}" WIDTH="{width}" HEIGHT="{height}">\n')
+        out.append(f'   <PrintSpace {alto_position([0, 0, width, height])}>\n')
+        line_id = word_id = 0
+        for block, pars in group_blocks(lines):
+            block_lines = [line for _, par_lines in pars for line in par_lines]
+            out.append(f'    <TextBlock ID="block_{number}_{block}" {alto_position(bounding_box([line["box"] for line in block_lines]))}>\n')
+            for line in block_lines:
+                line_id += 1
+                out.append(f'     <TextLine ID="line_{number}_{line_id}" {alto_position(line["box"])}>')
+                for index, word in enumerate(line['words']):
+                    word_id += 1
+                    if index:
+                        out.append('<SP/>')
+                    out.append(
+                        f'<String ID="string_{number}_{word_id}" {alto_position(word["box"])} '
+                        f'WC="{word["confidence"] / 100:.2f}" CONTENT={quoteattr(word["text"])}/>'
+                    )
+                out.append('</TextLine>\n')
+            out.append('    </TextBlock>\n')
+        out.append('   </PrintSpace>\n  </Page>\n')
+    out.append(' </Layout>\n</alto>\n')
+    return ''.join(out)
+
+XML_RENDERERS = {'hocr': render_hocr, 'alto': render_alto}
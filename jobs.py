@@ -0,0 +1,77 @@
+"""Bounded background job queue for long OCR requests
+
+POST /jobs hands work to a JobQueue and returns immediately; clients poll
+GET /jobs/<id> for the result. The queue runs jobs on a small thread pool and
+refuses new work once max_pending jobs are queued or running, which the apps
+turn into HTTP 429 responses.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when max_pending jobs are already waiting or running"""
+
+class JobQueue:
+    def __init__(self, workers=2, max_pending=16, result_ttl=600):
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ocr-job')
+        self._jobs = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            workers=config['JOB_WORKERS'],
+            max_pending=config['JOB_MAX_PENDING'],
+            result_ttl=config['JOB_RESULT_TTL'],
+        )
+    
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) and return its job id, or raise QueueFull"""
+        with self._lock:
+            self._expire()
+            if self._pending >= self.max_pending:
+                raise QueueFull(f'{self._pending} jobs pending')
+            self._pending += 1
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'status': 'queued',
+                'submitted_at': time.time(),
+            }
+        self._executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+    
+    def get(self, job_id):
+        """Return a snapshot of the job, or None if it is unknown or expired"""
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+    
+    def stats(self):
+        with self._lock:
+            return {'pending': self._pending, 'max_pending': self.max_pending, 'tracked': len(self._jobs)}
+    
+    def _run(self, job_id, fn, args, kwargs):
+        with self._lock:
+            self._jobs[job_id].update(status='running', started_at=time.time())
+        try:
+            result = fn(*args, **kwargs)
+            update = {'status': 'done', 'result': result}
+        except Exception as e:
+            update = {'status': 'failed', 'error': str(e)}
+        with self._lock:
+            self._jobs[job_id].update(update, finished_at=time.time())
+            self._pending -= 1
+    
+    def _expire(self):
+        # Caller holds the lock; forget finished jobs older than result_ttl
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.get('finished_at', cutoff + 1) < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,148 @@
+"""In-process OCR metrics, exported in the Prometheus text format on /metrics
+
+The engines time their stages with stage() (or record_stage() for a
+duration measured elsewhere, such as in a process pool) and count results,
+strategy runs and wins with inc(). Each observation is a perf_counter read
+and a few additions under one lock, cheap enough to leave on in production.
+
+Stage times are also added up per request when the request has called
+start_request(); the totals feed the optional X-OCR-Timing header. Work
+handed to a thread pool only reaches the request's totals when submitted
+through copy_context().run.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+config = {
+    'METRICS_ENABLED': True,
+}
+
+# Seconds; OCR stages run from milliseconds (decoding) to tens of seconds (large scans)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRICS = {
+    'ocr_requests_total': ('counter', 'HTTP requests by endpoint and status code'),
+    'ocr_request_seconds': ('histogram', 'HTTP request latency by endpoint'),
+    'ocr_requests_in_flight': ('gauge', 'HTTP requests being handled, by endpoint'),
+    'ocr_stage_seconds': ('histogram', 'Time spent in each OCR stage'),
+    'ocr_results_total': ('counter', 'OCR results by engine and outcome (ok, cached or error)'),
+    'ocr_strategy_runs_total': ('counter', 'Tesseract strategy passes run'),
+    'ocr_strategy_wins_total': ('counter', 'Tesseract strategies chosen as method_used'),
+    'ocr_auto_routed_total': ('counter', 'Images the auto engine answered with each engine'),
+    'ocr_jobs_pending': ('gauge', 'Background jobs queued or running'),
+    'ocr_cache_entries': ('gauge', 'Results held in the in-memory cache tier'),
+}
+
+_lock = threading.Lock()
+_values = {}  # (name, labels) -> number for counters and gauges
+_histograms = {}  # (name, labels) -> [bucket counts..., +Inf count, sum]
+_request_timings = contextvars.ContextVar('ocr_request_timings', default=None)
+
+def _key(name, labels):
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def inc(name, amount=1, **labels):
+    """Add to a counter (or a gauge, with a negative amount to subtract)"""
+    if not config['METRICS_ENABLED']:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _values[key] = _values.get(key, 0) + amount
+
+def set_gauge(name, value, **labels):
+    if not config['METRICS_ENABLED']:
+        return
+    with _lock:
+        _values[_key(name, labels)] = value
+
+def observe(name, value, **labels):
+    """Add one observation to a histogram"""
+    if not config['METRICS_ENABLED']:
+        return
+    key = _key(name, labels)
+    index = bisect.bisect_left(BUCKETS, value)
+    with _lock:
+        counts = _histograms.get(key)
+        if counts is None:
+            counts = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        counts[index] += 1
+        counts[-1] += value
+
+def count_result(engine, result):
+    """Count one engine result dict as ok, cached or error"""
+    if not result.get('success'):
+        outcome = 'error'
+    else:
+        outcome = 'cached' if result.get('cache') == 'hit' else 'ok'
+    inc('ocr_results_total', engine=engine, outcome=outcome)
+    return result
+
+def record_stage(stage, seconds, **labels):
+    """Record a stage duration measured by the caller"""
+    observe('ocr_stage_seconds', seconds, stage=stage, **labels)
+    timings = _request_timings.get()
+    if timings is not None:
+        with _lock:
+            timings[stage] = timings.get(stage, 0) + seconds
+
+@contextmanager
+def stage(name, **labels):
+    """Time the body as one OCR stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started, **labels)
+
+def start_request():
+    """Start adding up stage times for the current request; returns the token for finish_request"""
+    return _request_timings.set({})
+
+def finish_request(token):
+    """Stop adding up stage times, returning {stage: seconds} for the request"""
+    timings = _request_timings.get()
+    _request_timings.reset(token)
+    return timings or {}
+
+def timing_header(timings, total=None):
+    """Format stage totals as an X-OCR-Timing value in the Server-Timing syntax, in milliseconds"""
+    parts = [f'{stage};dur={seconds * 1000:.1f}' for stage, seconds in timings.items()]
+    if total is not None:
+        parts.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(parts)
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    with _lock:
+        values = dict(_values)
+        histograms = {key: list(counts) for key, counts in _histograms.items()}
+    
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        series = sorted(labels for metric, labels in (histograms if kind == 'histogram' else values) if metric == name)
+        if not series:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels in series:
+            if kind != 'histogram':
+                lines.append(f'{name}{_labels(labels)} {values[name, labels]}')
+                continue
+            counts = histograms[name, labels]
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(labels, [("le", str(bound))])} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {counts[-1]:.6f}')
+            lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,147 @@
+"""Content-addressed OCR result cache shared by the Tesseract and EasyOCR apps
+
+Results are keyed by a hash of the image content plus the engine and the
+settings that influence its output. A bounded in-memory LRU tier answers
+repeat uploads without any OCR work; an optional SQLite tier keeps results
+across restarts.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+CHUNK_SIZE = 1024 * 1024
+# Bump when the fields of cached results change, so older entries are never served
+RESULT_VERSION = 2
+
+config = {
+    'OCR_CACHE_ENABLED': True,
+    'OCR_CACHE_MAX_ENTRIES': 1024,
+    'OCR_CACHE_MAX_BYTES': 64 * 1024 * 1024,  # in-memory tier size limit
+    'OCR_CACHE_PATH': None,  # e.g. 'ocr_cache.sqlite3' to keep results across restarts
+}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def image_digest(source):
+    """Hash image content given as bytes, a path, a binary file object, an array or a PIL image"""
+    digest = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+    elif isinstance(source, str):
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+    elif isinstance(source, np.ndarray):
+        digest.update(f'{source.shape}{source.dtype}'.encode())
+        digest.update(np.ascontiguousarray(source).data)
+    elif isinstance(source, Image.Image):
+        digest.update(f'{source.mode}{source.size}'.encode())
+        digest.update(source.tobytes())
+    else:
+        # File object: hash from the start and leave it rewound for the decoder
+        source.seek(0)
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+        source.seek(0)
+    return digest.hexdigest()
+
+def make_key(source, engine, **settings):
+    """Build a cache key from image content, engine name and engine settings"""
+    settings_json = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(f'{engine}\0{RESULT_VERSION}\0{image_digest(source)}\0{settings_json}'.encode()).hexdigest()
+
+class ResultCache:
+    """Two-tier cache of JSON-serialisable OCR results, shared by every engine in the process"""
+    
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, db_path=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)'
+            )
+            self._db.commit()
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            max_entries=config['OCR_CACHE_MAX_ENTRIES'],
+            max_bytes=config['OCR_CACHE_MAX_BYTES'],
+            db_path=config['OCR_CACHE_PATH'],
+        )
+    
+    def get(self, key):
+        """Return a fresh copy of the cached result, or None on a miss"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            elif self._db is not None:
+                row = self._db.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    value = row[0]
+                    self._remember(key, value)
+            
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(value)
+    
+    def put(self, key, result):
+        value = json.dumps(result)
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO results (key, value, created) VALUES (?, ?, ?)',
+                    (key, value, time.time())
+                )
+                self._db.commit()
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0,
+                'entries': len(self._entries),
+                'bytes': self._size,
+            }
+    
+    def _remember(self, key, value):
+        # Caller holds the lock
+        if len(value) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        self._entries[key] = value
+        self._size += len(value)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+def get_cache():
+    """Return the process-wide result cache, or None when caching is disabled"""
+    global _cache
+    if not config['OCR_CACHE_ENABLED']:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache.from_config(config)
+        return _cache
@@ -0,0 +1,1372 @@
+"""OCRify web service: Tesseract and EasyOCR behind one Flask app
+
+The engine is picked per request with the 'engine' form field (see
+engines.ENGINES); both engines live in this one process and share their
+models, worker pools and the result cache.
+"""
+from flask import Flask, Request, Response, g, request, jsonify, stream_with_context, url_for, render_template_string
+import argparse
+import base64
+import json
+import logging
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+from io import BytesIO
+from PIL import Image
+from engines import ENGINES
+import bulk
+import formats
+import metrics
+import pages
+import serving
+from jobs import JobQueue, QueueFull
+from ocr_cache import get_cache
+
+class SpooledRequest(Request):
+    """Keeps uploads in memory, spilling to a temporary file above UPLOAD_SPOOL_THRESHOLD"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=app.config['UPLOAD_SPOOL_THRESHOLD'])
+
+app = Flask(__name__)
+app.request_class = SpooledRequest
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['UPLOAD_SPOOL_THRESHOLD'] = 4 * 1024 * 1024  # larger uploads are spooled to a temp file
+app.config['DEFAULT_ENGINE'] = 'tesseract'  # used when a request doesn't name one
+app.config['MAX_BATCH_FILES'] = 32
+app.config['JOB_WORKERS'] = 2  # background OCR jobs run concurrently
+app.config['JOB_MAX_PENDING'] = 16  # queued + running jobs before POST /jobs answers 429
+app.config['JOB_RESULT_TTL'] = 600  # seconds finished jobs stay pollable
+app.config['IMAGE_ECHO'] = 'none'  # default for the 'image' form field, one of IMAGE_ECHO_MODES
+app.config['THUMBNAIL_MAX_SIDE'] = 1024  # longest side of 'thumbnail' previews
+app.config['TIMING_HEADER'] = False  # add per-stage X-OCR-Timing headers to responses
+JOB_RETRY_AFTER = '5'
+IMAGE_ECHO_MODES = ('none', 'thumbnail', 'original')
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tif', 'tiff', 'pdf'}
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+# HTML Template as a string
+HTML_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>OCR Text Extractor - AI Powered</title>
+    <style>
+        * {
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }
+
+        body {
+            font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+            background: #0f0f23;
+            min-height: 100vh;
+            padding: 20px;
+            color: #fff;
+            position: relative;
+            overflow-x: hidden;
+        }
+
+        /* Animated background */
+        body::before {
+            content: '';
+            position: fixed;
+            top: 0;
+            left: 0;
+            width: 100%;
+            height: 100%;
+            background: 
+                radial-gradient(circle at 20% 50%, rgba(120, 119, 198, 0.15) 0%, transparent 50%),
+                radial-gradient(circle at 80% 80%, rgba(138, 43, 226, 0.15) 0%, transparent 50%),
+                radial-gradient(circle at 40% 20%, rgba(72, 149, 239, 0.15) 0%, transparent 50%);
+            animation: float 20s ease-in-out infinite;
+            z-index: 0;
+        }
+
+        @keyframes float {
+            0%, 100% { transform: translateY(0) scale(1); }
+            50% { transform: translateY(-20px) scale(1.05); }
+        }
+
+        .container {
+            max-width: 1400px;
+            margin: 0 auto;
+            position: relative;
+            z-index: 1;
+        }
+
+        .header {
+            text-align: center;
+            margin-bottom: 50px;
+            animation: fadeInDown 0.8s ease-out;
+        }
+
+        @keyframes fadeInDown {
+            from {
+                opacity: 0;
+                transform: translateY(-30px);
+            }
+            to {
+                opacity: 1;
+                transform: translateY(0);
+            }
+        }
+
+        .header h1 {
+            font-size: 3.5em;
+            margin-bottom: 15px;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+            background-clip: text;
+            font-weight: 800;
+            letter-spacing: -1px;
+        }
+
+        .header .subtitle {
+            font-size: 1.2em;
+            color: #a0a0c0;
+            font-weight: 300;
+        }
+
+        .header .tagline {
+            display: inline-block;
+            margin-top: 10px;
+            padding: 8px 20px;
+            background: rgba(102, 126, 234, 0.2);
+            border-radius: 20px;
+            font-size: 0.9em;
+            color: #8b9cff;
+            border: 1px solid rgba(102, 126, 234, 0.3);
+        }
+
+        .main-content {
+            background: rgba(25, 25, 45, 0.6);
+            backdrop-filter: blur(20px);
+            border-radius: 30px;
+            padding: 50px;
+            box-shadow: 0 30px 90px rgba(0, 0, 0, 0.5),
+                        0 0 0 1px rgba(255, 255, 255, 0.05);
+            border: 1px solid rgba(255, 255, 255, 0.05);
+            animation: fadeInUp 0.8s ease-out 0.2s both;
+        }
+
+        @keyframes fadeInUp {
+            from {
+                opacity: 0;
+                transform: translateY(30px);
+            }
+            to {
+                opacity: 1;
+                transform: translateY(0);
+            }
+        }
+
+        .upload-section {
+            text-align: center;
+            padding: 60px 40px;
+            border: 3px dashed rgba(102, 126, 234, 0.4);
+            border-radius: 20px;
+            background: rgba(102, 126, 234, 0.05);
+            transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
+            cursor: pointer;
+            position: relative;
+            overflow: hidden;
+        }
+
+        .upload-section::before {
+            content: '';
+            position: absolute;
+            top: 0;
+            left: -100%;
+            width: 100%;
+            height: 100%;
+            background: linear-gradient(90deg, transparent, rgba(102, 126, 234, 0.1), transparent);
+            transition: left 0.6s;
+        }
+
+        .upload-section:hover::before {
+            left: 100%;
+        }
+
+        .upload-section:hover {
+            border-color: #667eea;
+            background: rgba(102, 126, 234, 0.1);
+            transform: translateY(-5px);
+            box-shadow: 0 20px 40px rgba(102, 126, 234, 0.2);
+        }
+
+        .upload-section.dragover {
+            border-color: #f093fb;
+            background: rgba(240, 147, 251, 0.1);
+            transform: scale(1.02);
+        }
+
+        .upload-icon {
+            font-size: 5em;
+            margin-bottom: 20px;
+            animation: bounce 2s infinite;
+        }
+
+        @keyframes bounce {
+            0%, 100% { transform: translateY(0); }
+            50% { transform: translateY(-10px); }
+        }
+
+        .upload-section h2 {
+            color: #fff;
+            margin-bottom: 10px;
+            font-size: 1.8em;
+            font-weight: 600;
+        }
+
+        .upload-section p {
+            color: #a0a0c0;
+            margin-bottom: 30px;
+            font-size: 1.1em;
+        }
+
+        #fileInput {
+            display: none;
+        }
+
+        .engine-select {
+            margin-bottom: 25px;
+            color: #a0a0c0;
+        }
+
+        .engine-select select {
+            margin-left: 10px;
+            padding: 8px 16px;
+            border-radius: 20px;
+            border: 1px solid rgba(102, 126, 234, 0.4);
+            background: rgba(25, 25, 45, 0.9);
+            color: #e0e0ff;
+            font-size: 1em;
+            cursor: pointer;
+        }
+
+        .btn {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            border: none;
+            padding: 16px 40px;
+            border-radius: 30px;
+            font-size: 1.1em;
+            cursor: pointer;
+            transition: all 0.3s ease;
+            font-weight: 600;
+            box-shadow: 0 10px 30px rgba(102, 126, 234, 0.3);
+            position: relative;
+            overflow: hidden;
+        }
+
+        .btn::before {
+            content: '';
+            position: absolute;
+            top: 0;
+            left: -100%;
+            width: 100%;
+            height: 100%;
+            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.2), transparent);
+            transition: left 0.5s;
+        }
+
+        .btn:hover::before {
+            left: 100%;
+        }
+
+        .btn:hover {
+            transform: translateY(-3px);
+            box-shadow: 0 15px 40px rgba(102, 126, 234, 0.5);
+        }
+
+        .btn:active {
+            transform: translateY(-1px);
+        }
+
+        .btn:disabled {
+            opacity: 0.5;
+            cursor: not-allowed;
+        }
+
+        .results-section {
+            display: none;
+            margin-top: 40px;
+            animation: fadeInUp 0.6s ease-out;
+        }
+
+        .results-header {
+            color: #fff;
+            margin-bottom: 30px;
+            font-size: 2em;
+            font-weight: 700;
+            text-align: center;
+        }
+
+        .results-grid {
+            display: grid;
+            grid-template-columns: 1fr 1fr;
+            gap: 30px;
+            margin-top: 20px;
+        }
+
+        @media (max-width: 968px) {
+            .results-grid {
+                grid-template-columns: 1fr;
+            }
+            .header h1 {
+                font-size: 2.5em;
+            }
+            .main-content {
+                padding: 30px 20px;
+            }
+        }
+
+        .result-card {
+            background: rgba(35, 35, 60, 0.6);
+            backdrop-filter: blur(10px);
+            border-radius: 20px;
+            padding: 30px;
+            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.3);
+            border: 1px solid rgba(255, 255, 255, 0.05);
+            transition: all 0.3s ease;
+        }
+
+        .result-card:hover {
+            transform: translateY(-5px);
+            box-shadow: 0 15px 40px rgba(0, 0, 0, 0.4);
+        }
+
+        .result-card h3 {
+            background: linear-gradient(135deg, #667eea, #764ba2);
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+            background-clip: text;
+            margin-bottom: 20px;
+            font-size: 1.5em;
+            font-weight: 700;
+        }
+
+        .image-container {
+            position: relative;
+            border-radius: 15px;
+            overflow: hidden;
+            margin-bottom: 20px;
+            box-shadow: 0 10px 30px rgba(0, 0, 0, 0.3);
+            cursor: pointer;
+            transition: all 0.3s ease;
+        }
+
+        .image-container:hover {
+            transform: scale(1.02);
+            box-shadow: 0 15px 40px rgba(102, 126, 234, 0.3);
+        }
+
+        .image-preview {
+            width: 100%;
+            display: block;
+            border-radius: 15px;
+        }
+
+        .image-overlay {
+            position: absolute;
+            top: 0;
+            left: 0;
+            right: 0;
+            bottom: 0;
+            background: rgba(0, 0, 0, 0.7);
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            opacity: 0;
+            transition: opacity 0.3s ease;
+            border-radius: 15px;
+        }
+
+        .image-container:hover .image-overlay {
+            opacity: 1;
+        }
+
+        .image-overlay span {
+            color: white;
+            font-size: 1.2em;
+            font-weight: 600;
+            padding: 10px 20px;
+            background: rgba(102, 126, 234, 0.8);
+            border-radius: 10px;
+        }
+
+        .extracted-text {
+            background: rgba(20, 20, 35, 0.8);
+            padding: 25px;
+            border-radius: 15px;
+            border-left: 4px solid #667eea;
+            white-space: pre-wrap;
+            word-wrap: break-word;
+            max-height: 400px;
+            overflow-y: auto;
+            font-family: 'Monaco', 'Courier New', monospace;
+            line-height: 1.8;
+            color: #e0e0f0;
+            font-size: 0.95em;
+        }
+
+        .extracted-text::-webkit-scrollbar {
+            width: 8px;
+        }
+
+        .extracted-text::-webkit-scrollbar-track {
+            background: rgba(0, 0, 0, 0.2);
+            border-radius: 10px;
+        }
+
+        .extracted-text::-webkit-scrollbar-thumb {
+            background: #667eea;
+            border-radius: 10px;
+        }
+
+        .stats {
+            display: flex;
+            gap: 15px;
+            margin-bottom: 20px;
+        }
+
+        .stat-item {
+            background: rgba(102, 126, 234, 0.1);
+            padding: 15px;
+            border-radius: 12px;
+            flex: 1;
+            text-align: center;
+            border: 1px solid rgba(102, 126, 234, 0.2);
+            transition: all 0.3s ease;
+        }
+
+        .stat-item:hover {
+            background: rgba(102, 126, 234, 0.15);
+            transform: translateY(-3px);
+        }
+
+        .stat-value {
+            font-size: 2em;
+            font-weight: 800;
+            background: linear-gradient(135deg, #667eea, #f093fb);
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+            background-clip: text;
+        }
+
+        .stat-label {
+            font-size: 0.9em;
+            color: #a0a0c0;
+            margin-top: 5px;
+        }
+
+        .loading {
+            display: none;
+            text-align: center;
+            padding: 60px;
+        }
+
+        .spinner {
+            width: 60px;
+            height: 60px;
+            margin: 0 auto 30px;
+            position: relative;
+        }
+
+        .spinner::before,
+        .spinner::after {
+            content: '';
+            position: absolute;
+            border-radius: 50%;
+            animation: pulse 2s ease-in-out infinite;
+        }
+
+        .spinner::before {
+            width: 60px;
+            height: 60px;
+            border: 4px solid rgba(102, 126, 234, 0.3);
+            animation: spin 1s linear infinite;
+        }
+
+        .spinner::after {
+            width: 60px;
+            height: 60px;
+            border: 4px solid transparent;
+            border-top-color: #667eea;
+            border-right-color: #764ba2;
+            animation: spin 1s linear infinite;
+        }
+
+        @keyframes spin {
+            0% { transform: rotate(0deg); }
+            100% { transform: rotate(360deg); }
+        }
+
+        @keyframes pulse {
+            0%, 100% { opacity: 1; }
+            50% { opacity: 0.5; }
+        }
+
+        .loading p {
+            color: #a0a0c0;
+            font-size: 1.1em;
+        }
+
+        .error {
+            background: rgba(255, 59, 92, 0.2);
+            color: #ff6b9d;
+            padding: 20px;
+            border-radius: 15px;
+            margin-top: 20px;
+            display: none;
+            border: 1px solid rgba(255, 59, 92, 0.3);
+            animation: shake 0.5s;
+        }
+
+        @keyframes shake {
+            0%, 100% { transform: translateX(0); }
+            25% { transform: translateX(-10px); }
+            75% { transform: translateX(10px); }
+        }
+
+        .copy-btn {
+            background: linear-gradient(135deg, #11998e, #38ef7d);
+            color: white;
+            border: none;
+            padding: 12px 30px;
+            border-radius: 25px;
+            cursor: pointer;
+            font-size: 1em;
+            font-weight: 600;
+            margin-top: 15px;
+            box-shadow: 0 8px 20px rgba(56, 239, 125, 0.3);
+            transition: all 0.3s ease;
+        }
+
+        .copy-btn:hover {
+            transform: translateY(-3px);
+            box-shadow: 0 12px 30px rgba(56, 239, 125, 0.4);
+        }
+
+        .copy-btn:active {
+            transform: translateY(-1px);
+        }
+
+        /* Modal for full image view */
+        .modal {
+            display: none;
+            position: fixed;
+            z-index: 1000;
+            left: 0;
+            top: 0;
+            width: 100%;
+            height: 100%;
+            background-color: rgba(0, 0, 0, 0.95);
+            animation: fadeIn 0.3s;
+        }
+
+        @keyframes fadeIn {
+            from { opacity: 0; }
+            to { opacity: 1; }
+        }
+
+        .modal-content {
+            margin: auto;
+            display: block;
+            max-width: 90%;
+            max-height: 90%;
+            position: absolute;
+            top: 50%;
+            left: 50%;
+            transform: translate(-50%, -50%);
+            border-radius: 10px;
+            box-shadow: 0 20px 60px rgba(0, 0, 0, 0.5);
+        }
+
+        .close-modal {
+            position: absolute;
+            top: 30px;
+            right: 50px;
+            color: #fff;
+            font-size: 40px;
+            font-weight: bold;
+            cursor: pointer;
+            z-index: 1001;
+            transition: all 0.3s ease;
+        }
+
+        .close-modal:hover {
+            color: #667eea;
+            transform: rotate(90deg);
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>✨ OCR Text Extractor</h1>
+            <p class="subtitle">AI-Powered Document Text Recognition</p>
+            <div class="tagline">🚀 Extract text from any image instantly</div>
+        </div>
+
+        <div class="main-content">
+            <div class="upload-section" id="uploadSection">
+                <div class="upload-icon">📸</div>
+                <h2>Upload Your Document</h2>
+                <p>Drag and drop an image here or click to browse</p>
+                <div class="engine-select">
+                    <label for="engineSelect">OCR engine</label>
+                    <select id="engineSelect">
+                        <option value="tesseract">Tesseract (classical, fast)</option>
+                        <option value="easyocr">EasyOCR (deep learning)</option>
+                        <option value="auto">Auto (Tesseract, EasyOCR when needed)</option>
+                    </select>
+                </div>
+                <input type="file" id="fileInput" accept="image/*,application/pdf">
+                <button class="btn" onclick="document.getElementById('fileInput').click()">
+                    Choose File
+                </button>
+            </div>
+
+            <div class="loading" id="loading">
+                <div class="spinner"></div>
+                <p id="loadingText">🔍 Processing image and extracting text...</p>
+            </div>
+
+            <div class="error" id="error"></div>
+
+            <div class="results-section" id="results">
+                <h2 class="results-header">✅ Extraction Results</h2>
+                <div class="results-grid">
+                    <div class="result-card">
+                        <h3>📷 Original Image</h3>
+                        <div class="image-container" onclick="openModal()">
+                            <img id="previewImage" class="image-preview" alt="Uploaded image">
+                            <div class="image-overlay">
+                                <span>🔍 Click to view full size</span>
+                            </div>
+                        </div>
+                        <div class="stats">
+                            <div class="stat-item">
+                                <div class="stat-value" id="regionsCount">0</div>
+                                <div class="stat-label" id="regionsLabel">Text Regions</div>
+                            </div>
+                            <div class="stat-item">
+                                <div class="stat-value" id="charCount">0</div>
+                                <div class="stat-label">Characters</div>
+                            </div>
+                            <div class="stat-item">
+                                <div class="stat-value" id="confidence">0%</div>
+                                <div class="stat-label">Confidence</div>
+                            </div>
+                        </div>
+                    </div>
+                    <div class="result-card">
+                        <h3>📝 Extracted Text</h3>
+                        <div class="extracted-text" id="extractedText"></div>
+                        <button class="copy-btn" onclick="copyText()">📋 Copy Text</button>
+                    </div>
+                </div>
+            </div>
+        </div>
+    </div>
+
+    <!-- Modal for full image view -->
+    <div id="imageModal" class="modal" onclick="closeModal()">
+        <span class="close-modal">&times;</span>
+        <img class="modal-content" id="modalImage">
+    </div>
+
+    <script>
+        const uploadSection = document.getElementById('uploadSection');
+        const fileInput = document.getElementById('fileInput');
+        const loading = document.getElementById('loading');
+        const results = document.getElementById('results');
+        const error = document.getElementById('error');
+        const loadingText = document.getElementById('loadingText');
+        const engineSelect = document.getElementById('engineSelect');
+        engineSelect.value = '{{ default_engine }}';
+        let currentImageData = '';
+        const BROWSER_IMAGE_TYPES = ['image/png', 'image/jpeg', 'image/gif', 'image/bmp', 'image/webp'];
+
+        uploadSection.addEventListener('dragover', (e) => {
+            e.preventDefault();
+            uploadSection.classList.add('dragover');
+        });
+
+        uploadSection.addEventListener('dragleave', () => {
+            uploadSection.classList.remove('dragover');
+        });
+
+        uploadSection.addEventListener('drop', (e) => {
+            e.preventDefault();
+            uploadSection.classList.remove('dragover');
+            const files = e.dataTransfer.files;
+            if (files.length > 0) {
+                handleFile(files[0]);
+            }
+        });
+
+        fileInput.addEventListener('change', (e) => {
+            if (e.target.files.length > 0) {
+                handleFile(e.target.files[0]);
+            }
+        });
+
+        async function handleFile(file) {
+            if (!file.type.startsWith('image/') && file.type !== 'application/pdf') {
+                showError('Please upload a valid image or PDF file');
+                return;
+            }
+
+            // Preview straight from the File; only formats browsers can't show need a server thumbnail
+            const needsThumbnail = !BROWSER_IMAGE_TYPES.includes(file.type);
+            if (currentImageData.startsWith('blob:')) {
+                URL.revokeObjectURL(currentImageData);
+            }
+            currentImageData = needsThumbnail ? '' : URL.createObjectURL(file);
+            document.getElementById('previewImage').src = currentImageData;
+
+            const formData = new FormData();
+            formData.append('file', file);
+            formData.append('engine', engineSelect.value);
+            formData.append('image', needsThumbnail ? 'thumbnail' : 'none');
+
+            uploadSection.style.display = 'none';
+            loading.style.display = 'block';
+            loadingText.textContent = '🔍 Processing image and extracting text...';
+            results.style.display = 'none';
+            error.style.display = 'none';
+
+            // Results arrive as NDJSON events; partial text is shown until the final 'result' event
+            try {
+                const response = await fetch('/upload/stream', {
+                    method: 'POST',
+                    body: formData
+                });
+                if (!response.ok) {
+                    const data = await response.json();
+                    throw new Error(data.error || response.statusText);
+                }
+
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                const parts = new Map();
+                let buffer = '';
+                while (true) {
+                    const { done, value } = await reader.read();
+                    if (done) {
+                        break;
+                    }
+                    buffer += decoder.decode(value, { stream: true });
+                    const lines = buffer.split('\n');
+                    buffer = lines.pop();
+                    for (const line of lines) {
+                        if (line.trim()) {
+                            handleEvent(JSON.parse(line), parts);
+                        }
+                    }
+                }
+            } catch (err) {
+                loading.style.display = 'none';
+                showError('Failed to process image: ' + err.message);
+            }
+        }
+
+        // Partial text is kept per page (and per band of a tiled page) so pages finishing out of order render in order
+        function partKey(event) {
+            return (event.page || 1) * 10000 + (event.tile || 0);
+        }
+
+        function clearPage(parts, page) {
+            for (const key of [...parts.keys()]) {
+                if (Math.floor(key / 10000) === page) {
+                    parts.delete(key);
+                }
+            }
+        }
+
+        function handleEvent(event, parts) {
+            if (event.event === 'result') {
+                loading.style.display = 'none';
+                if (event.success) {
+                    displayResults(event);
+                } else {
+                    results.style.display = 'none';
+                    showError(event.error || 'An error occurred during processing');
+                }
+                return;
+            }
+
+            if (event.event === 'routing') {
+                // A new engine starts over on this page
+                clearPage(parts, event.page || 1);
+                loadingText.textContent = '🔀 Using ' + event.engine + ' (' + event.reason + ')...';
+            } else if (event.event === 'strategy') {
+                // Keep the most confident strategy so far
+                const part = parts.get(partKey(event));
+                if (!part || event.avg_confidence >= part.confidence) {
+                    parts.set(partKey(event), { text: event.text, confidence: event.avg_confidence });
+                }
+                loadingText.textContent = '🔍 Strategy ' + event.strategy + ' finished (' + event.avg_confidence + '%)...';
+            } else if (event.event === 'detection') {
+                const part = parts.get(partKey(event)) || { text: '', confidence: 0 };
+                part.text = part.text ? part.text + '\n' + event.text : event.text;
+                parts.set(partKey(event), part);
+                loadingText.textContent = '🔍 Recognised "' + event.text + '"...';
+            } else if (event.event === 'page') {
+                clearPage(parts, event.page);
+                parts.set(partKey(event), { text: event.text || '', confidence: 0 });
+                loadingText.textContent = '📄 Page ' + event.page + ' done...';
+            } else {
+                return;
+            }
+
+            const text = [...parts.keys()].sort((a, b) => a - b).map(key => parts.get(key).text).filter(Boolean).join('\n\n');
+            if (text) {
+                document.getElementById('extractedText').textContent = text;
+                results.style.display = 'block';
+            }
+        }
+
+        function displayResults(data) {
+            if (data.thumbnail) {
+                currentImageData = 'data:image/jpeg;base64,' + data.thumbnail;
+                document.getElementById('previewImage').src = currentImageData;
+            }
+            document.getElementById('extractedText').textContent = data.text || 'No text detected';
+            if (data.pages) {
+                // Multi-page documents: page count and the mean confidence of the pages
+                const confidences = data.pages.filter(page => page.success).map(page => page.avg_confidence ?? page.confidence ?? 0);
+                const meanConfidence = confidences.length ? confidences.reduce((a, b) => a + b, 0) / confidences.length : 0;
+                document.getElementById('regionsLabel').textContent = 'Pages';
+                document.getElementById('regionsCount').textContent = data.page_count;
+                document.getElementById('charCount').textContent = data.text.length;
+                document.getElementById('confidence').textContent = meanConfidence.toFixed(2) + '%';
+            } else {
+                // Tesseract reports text regions and avg_confidence, EasyOCR detections and confidence
+                const isEasyOCR = (data.engine_used || data.engine) === 'easyocr';
+                document.getElementById('regionsLabel').textContent = isEasyOCR ? 'Text Detections' : 'Text Regions';
+                document.getElementById('regionsCount').textContent = (isEasyOCR ? data.detections : data.regions_count) || 0;
+                document.getElementById('charCount').textContent = (isEasyOCR ? data.char_count : data.text.length) || 0;
+                document.getElementById('confidence').textContent = ((isEasyOCR ? data.confidence : data.avg_confidence) || 0) + '%';
+            }
+            
+            results.style.display = 'block';
+            uploadSection.style.display = 'block';
+        }
+
+        function showError(message) {
+            error.textContent = '❌ ' + message;
+            error.style.display = 'block';
+            uploadSection.style.display = 'block';
+        }
+
+        function copyText() {
+            const text = document.getElementById('extractedText').textContent;
+            navigator.clipboard.writeText(text).then(() => {
+                const btn = event.target;
+                const originalText = btn.textContent;
+                btn.textContent = '✅ Copied!';
+                setTimeout(() => {
+                    btn.textContent = originalText;
+                }, 2000);
+            });
+        }
+
+        function openModal() {
+            const modal = document.getElementById('imageModal');
+            const modalImg = document.getElementById('modalImage');
+            modal.style.display = 'block';
+            modalImg.src = currentImageData;
+        }
+
+        function closeModal() {
+            document.getElementById('imageModal').style.display = 'none';
+        }
+
+        // Close modal with Escape key
+        document.addEventListener('keydown', (e) => {
+            if (e.key === 'Escape') {
+                closeModal();
+            }
+        });
+    </script>
+</body>
+</html>
+"""
+
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def get_job_queue():
+    """Return the shared background job queue, creating it on first use"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue.from_config(app.config)
+        return _job_queue
+
+def parse_engine():
+    """Pick the requested engine and parse its options from the current request
+    
+    Returns (engine, options, None) on success or (None, None, error response).
+    """
+    name = request.form.get('engine') or app.config['DEFAULT_ENGINE']
+    engine = ENGINES.get(name)
+    if engine is None:
+        return None, None, (jsonify({'error': f'Unknown engine: {name}'}), 400)
+    
+    try:
+        options = engine.parse_options(request.form)
+    except ValueError as e:
+        return None, None, (jsonify({'error': str(e)}), 400)
+    
+    return engine, options, None
+
+def parse_image_echo():
+    """Read the 'image' form field, which picks how the upload is echoed back (see IMAGE_ECHO_MODES)
+    
+    Returns (mode, None) on success or (None, error response).
+    """
+    mode = request.form.get('image') or app.config['IMAGE_ECHO']
+    if mode not in IMAGE_ECHO_MODES:
+        return None, (jsonify({'error': f'Invalid image mode: {mode}'}), 400)
+    return mode, None
+
+def parse_output():
+    """Read the /api/v1/ocr 'output' form field, one of formats.OUTPUTS
+    
+    Returns (output, None) on success or (None, error response).
+    """
+    output = request.form.get('output') or 'text'
+    if output not in formats.OUTPUTS:
+        return None, (jsonify({'error': f'Invalid output: {output}'}), 400)
+    return output, None
+
+def parse_upload():
+    """Validate the current request's file, engine and OCR options
+    
+    Returns (file, engine, options, None) on success or (None, None, None, error response).
+    """
+    with metrics.stage('upload'):
+        # Reading the multipart form receives and spools the upload
+        request.files
+    if 'file' not in request.files:
+        return None, None, None, (jsonify({'error': 'No file uploaded'}), 400)
+    
+    file = request.files['file']
+    
+    if file.filename == '':
+        return None, None, None, (jsonify({'error': 'No file selected'}), 400)
+    
+    if not allowed_file(file.filename):
+        return None, None, None, (jsonify({'error': 'Invalid file type'}), 400)
+    
+    engine, options, error = parse_engine()
+    if error:
+        return None, None, None, error
+    
+    return file, engine, options, None
+
+def build_result(engine, result):
+    """Response fields for one engine result (an image or a document page)"""
+    if not result['success']:
+        return {'error': result['error'], 'success': False}
+    
+    return {
+        'text': result['text'],
+        **engine.response(result),
+        'cache': result.get('cache'),
+        'success': True
+    }
+
+def encode_thumbnail(image):
+    """Base64 JPEG of an image, downscaled to THUMBNAIL_MAX_SIDE"""
+    max_side = app.config['THUMBNAIL_MAX_SIDE']
+    with metrics.stage('encode'):
+        # For JPEG uploads, let the decoder skip straight to a reduced size
+        image.draft('RGB', (max_side, max_side))
+        thumbnail = image.convert('RGB')
+        thumbnail.thumbnail((max_side, max_side))
+        buffer = BytesIO()
+        thumbnail.save(buffer, format='JPEG', quality=85)
+        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+def echo_original(stream):
+    with metrics.stage('encode'):
+        stream.seek(0)
+        return base64.b64encode(stream.read()).decode('utf-8')
+
+def build_response(engine, result, stream, image_echo='none'):
+    """Build the /upload response body for an engine result
+    
+    image_echo 'original' adds the upload as base64 'image'; 'thumbnail'
+    adds a downscaled JPEG as 'thumbnail'.
+    """
+    body = {'engine': engine.name, **build_result(engine, result)}
+    if body['success'] and image_echo == 'original':
+        body['image'] = echo_original(stream)
+    elif body['success'] and image_echo == 'thumbnail':
+        stream.seek(0)
+        with Image.open(stream) as image:
+            body['thumbnail'] = encode_thumbnail(image)
+    return body
+
+def iter_document(engine, stream, options, preview=None, progress=None):
+    """OCR a multi-page upload, yielding one page body at a time in page order
+    
+    If preview is a dict, a thumbnail of the first page is stored in it
+    under 'thumbnail'. Engine progress events are passed on tagged with
+    their 'page'.
+    """
+    def page_stream():
+        for number, image in pages.iter_pages(stream):
+            if number == 1 and preview is not None:
+                preview['thumbnail'] = encode_thumbnail(image)
+            yield number, image
+    
+    def extract_page(number, image):
+        page_progress = None
+        if progress is not None:
+            page_progress = lambda event: progress({**event, 'page': number})
+        return engine.extract_image(image, options, page_progress)
+    
+    for number, result in pages.iter_page_results(page_stream(), extract_page):
+        yield {'page': number, **build_result(engine, result)}
+
+def ocr_document(engine, stream, options, progress=None, image_echo='none'):
+    """OCR a multi-page upload and build the /upload response body
+    
+    progress, if given, also receives a 'page' event as each page completes.
+    image_echo works as in build_response; the thumbnail shows the first page.
+    """
+    preview = {} if image_echo == 'thumbnail' else None
+    page_bodies = []
+    try:
+        for page in iter_document(engine, stream, options, preview, progress):
+            page_bodies.append(page)
+            if progress is not None:
+                progress({'event': 'page', **page})
+        total_pages = pages.page_count(stream)
+    except Exception as e:
+        return {'error': str(e), 'engine': engine.name, 'success': False}
+    
+    return {
+        'engine': engine.name,
+        'text': '\n\n'.join(page['text'] for page in page_bodies if page['success']),
+        'pages': page_bodies,
+        'page_count': len(page_bodies),
+        'truncated': total_pages > len(page_bodies),
+        **(preview or {}),
+        **({'image': echo_original(stream)} if image_echo == 'original' else {}),
+        'success': all(page['success'] for page in page_bodies)
+    }
+
+def ocr_upload(engine, stream, options, progress=None, image_echo='none'):
+    """OCR an uploaded image or multi-page document and build the /upload response body"""
+    if pages.is_document(stream):
+        return ocr_document(engine, stream, options, progress, image_echo)
+    return build_response(engine, engine.extract(stream, options, progress), stream, image_echo)
+
+def stream_upload(engine, stream, options, image_echo='none'):
+    """Run ocr_upload on a worker thread, yielding its progress events and then the result as NDJSON lines"""
+    events = queue.Queue()
+    
+    def work():
+        try:
+            body = ocr_upload(engine, stream, options, events.put, image_echo)
+        except Exception as e:
+            body = {'error': str(e), 'engine': engine.name, 'success': False}
+        events.put({'event': 'result', **body})
+        events.put(None)
+    
+    threading.Thread(target=work, name='ocr-stream', daemon=True).start()
+    yield json.dumps({'event': 'start', 'engine': engine.name}) + '\n'
+    while True:
+        event = events.get()
+        if event is None:
+            break
+        yield json.dumps(event) + '\n'
+
+def iter_api_pages(engine, stream, options):
+    """OCR an upload for /api/v1/ocr, yielding (page number, (width, height), result) in page order"""
+    if pages.is_document(stream):
+        def extract_page(number, image):
+            return image.size, engine.extract_image(image, options)
+        
+        for number, (size, result) in pages.iter_page_results(pages.iter_pages(stream), extract_page):
+            yield number, size, result
+        return
+    
+    result = engine.extract(stream, options)
+    yield 1, result.get('size'), result
+
+def api_page(engine, output, number, size, result):
+    """One page of a JSON /api/v1/ocr response, with only the requested output computed"""
+    if not result['success']:
+        return {'page': number, 'error': result['error'], 'success': False}
+    
+    page = {'page': number, 'width': size[0], 'height': size[1]}
+    if output == 'text':
+        page['text'] = result['text']
+    elif output == 'lines':
+        page['lines'] = formats.render_lines(engine.lines(result))
+    else:
+        page['words'] = formats.render_words(engine.lines(result))
+    page['success'] = True
+    return page
+
+def endpoint_label():
+    # The URL rule, not the path, so /jobs/<job_id> stays one series
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+@app.before_request
+def start_metrics():
+    g.metrics_started = time.perf_counter()
+    g.metrics_token = metrics.start_request()
+    metrics.inc('ocr_requests_in_flight', endpoint=endpoint_label())
+
+def count_request(status):
+    """Count the current request and record its latency, returning the seconds it took"""
+    elapsed = time.perf_counter() - g.metrics_started
+    endpoint = endpoint_label()
+    metrics.inc('ocr_requests_total', endpoint=endpoint, status=status)
+    metrics.observe('ocr_request_seconds', elapsed, endpoint=endpoint)
+    return elapsed
+
+@app.after_request
+def record_metrics(response):
+    # Streamed responses send their headers before any OCR has run; they
+    # are counted by finish_metrics once the stream has ended
+    if response.is_streamed:
+        g.metrics_status = response.status_code
+        return response
+    elapsed = count_request(response.status_code)
+    if app.config['TIMING_HEADER']:
+        response.headers['X-OCR-Timing'] = metrics.timing_header(metrics.finish_request(g.pop('metrics_token')), elapsed)
+    return response
+
+@app.teardown_request
+def finish_metrics(error=None):
+    # Streamed bodies are wrapped in stream_with_context, which holds off
+    # the teardown until the generator finishes or the client goes away
+    if 'metrics_status' in g:
+        count_request(g.pop('metrics_status'))
+    if 'metrics_started' in g:
+        metrics.inc('ocr_requests_in_flight', -1, endpoint=endpoint_label())
+    if 'metrics_token' in g:
+        metrics.finish_request(g.pop('metrics_token'))
+
+@app.route('/')
+def index():
+    return render_template_string(HTML_TEMPLATE, default_engine=app.config['DEFAULT_ENGINE'])
+
+@app.route('/status', methods=['GET'])
+def status():
+    cache = get_cache()
+    return jsonify({
+        'engines': {name: engine.status() for name, engine in ENGINES.items()},
+        'cache': cache.stats() if cache is not None else None,
+        'jobs': get_job_queue().stats(),
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus scrape endpoint; with `serve`, each worker process reports its own metrics"""
+    cache = get_cache()
+    if cache is not None:
+        metrics.set_gauge('ocr_cache_entries', cache.stats()['entries'])
+    metrics.set_gauge('ocr_jobs_pending', get_job_queue().stats()['pending'])
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/upload', methods=['POST'])
+def upload_file():
+    file, engine, options, error = parse_upload()
+    if error:
+        return error
+    image_echo, error = parse_image_echo()
+    if error:
+        return error
+    
+    body = ocr_upload(engine, file.stream, options, image_echo=image_echo)
+    with metrics.stage('serialize'):
+        response = jsonify(body)
+    return response, 200 if body['success'] else 500
+
+@app.route('/upload/stream', methods=['POST'])
+def upload_stream():
+    """Like /upload, but answers with NDJSON events as strategies, detections and pages finish"""
+    file, engine, options, error = parse_upload()
+    if error:
+        return error
+    image_echo, error = parse_image_echo()
+    if error:
+        return error
+    
+    # Copy the upload: OCR runs on its own thread while the response streams
+    stream = BytesIO(file.read())
+    return Response(
+        stream_with_context(stream_upload(engine, stream, options, image_echo)),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/upload/batch', methods=['POST'])
+def upload_batch():
+    files = request.files.getlist('files')
+    if not files:
+        return jsonify({'error': 'No files uploaded'}), 400
+    
+    if len(files) > app.config['MAX_BATCH_FILES']:
+        return jsonify({'error': f"At most {app.config['MAX_BATCH_FILES']} files per batch"}), 400
+    
+    engine, options, error = parse_engine()
+    if error:
+        return error
+    image_echo, error = parse_image_echo()
+    if error:
+        return error
+    
+    valid_files = [file for file in files if file.filename != '' and allowed_file(file.filename)]
+    # Multi-page documents are OCR'd page by page; single images are batched through the engine
+    documents = [pages.is_document(file.stream) for file in valid_files]
+    images = [file.stream for file, document in zip(valid_files, documents) if not document]
+    ocr_results = iter(engine.extract_batch(images, options))
+    valid_documents = iter(documents)
+    
+    results = []
+    for file in files:
+        if file.filename == '' or not allowed_file(file.filename):
+            results.append({'filename': file.filename, 'error': 'Invalid file type', 'success': False})
+        elif next(valid_documents):
+            results.append({'filename': file.filename, **ocr_document(engine, file.stream, options, image_echo=image_echo)})
+        else:
+            results.append({'filename': file.filename, **build_response(engine, next(ocr_results), file.stream, image_echo)})
+    
+    return jsonify({'results': results, 'success': True})
+
+@app.route('/api/v1/ocr', methods=['POST'])
+def api_ocr():
+    """OCR an image or document at the granularity named by 'output' (see formats.OUTPUTS)
+    
+    text, lines and words answer with JSON pages; hocr and alto answer with
+    one XML document covering every page.
+    """
+    file, engine, options, error = parse_upload()
+    if error:
+        return error
+    output, error = parse_output()
+    if error:
+        return error
+    
+    try:
+        results = list(iter_api_pages(engine, file.stream, options))
+    except Exception as e:
+        return jsonify({'error': str(e), 'engine': engine.name, 'success': False}), 500
+    
+    if output in formats.XML_RENDERERS:
+        for number, _, result in results:
+            if not result['success']:
+                return jsonify({'error': result['error'], 'page': number, 'engine': engine.name, 'success': False}), 500
+        with metrics.stage('serialize'):
+            document = formats.XML_RENDERERS[output](
+                [(number, size, engine.lines(result)) for number, size, result in results], engine.name
+            )
+        return Response(document, mimetype=formats.XML_OUTPUTS[output])
+    
+    page_bodies = [api_page(engine, output, number, size, result) for number, size, result in results]
+    body = {'engine': engine.name, 'output': output, 'pages': page_bodies}
+    if output == 'text':
+        body['text'] = '\n\n'.join(page['text'] for page in page_bodies if page['success'])
+    body['success'] = all(page['success'] for page in page_bodies)
+    with metrics.stage('serialize'):
+        data = formats.dumps(body)
+    return Response(data, status=200 if body['success'] else 500, mimetype='application/json')
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    file, engine, options, error = parse_upload()
+    if error:
+        return error
+    image_echo, error = parse_image_echo()
+    if error:
+        return error
+    
+    # Copy the upload: the request stream is closed once this response is sent
+    stream = BytesIO(file.read())
+    try:
+        job_id = get_job_queue().submit(ocr_upload, engine, stream, options, image_echo=image_echo)
+    except QueueFull:
+        return jsonify({'error': 'Too many pending jobs, retry later', 'success': False}), 429, {'Retry-After': JOB_RETRY_AFTER}
+    
+    return jsonify({'job_id': job_id, 'status': 'queued'}), 202, {'Location': url_for('get_job', job_id=job_id)}
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job)
+
+def run_server(default_engine=None):
+    """Run the development server, optionally preselecting an engine"""
+    if default_engine:
+        app.config['DEFAULT_ENGINE'] = default_engine
+    
+    print("=" * 50)
+    print("OCR Text Extractor Server Starting...")
+    print(f"Engines: {', '.join(ENGINES)} (default: {app.config['DEFAULT_ENGINE']})")
+    print("=" * 50)
+    print("Server running at: http://127.0.0.1:5000")
+    print("Or access via: http://localhost:5000")
+    print("=" * 50)
+    print("Press CTRL+C to stop the server")
+    print("=" * 50)
+    # Show the auto engine's routing decisions alongside the request log
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    # With the reloader on, only the child process (WERKZEUG_RUN_MAIN set) serves requests
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        for engine in ENGINES.values():
+            engine.warmup()
+    app.run(debug=True, host='0.0.0.0', port=5000, use_reloader=True)
+
+def main(argv=None):
+    """Command line entry point: `python -m ocrify [dev|serve|run|bench]`"""
+    parser = argparse.ArgumentParser(prog='python -m ocrify', description='OCRify text extraction service')
+    commands = parser.add_subparsers(dest='command')
+    dev = commands.add_parser('dev', help='run the development server with the reloader (the default)')
+    dev.add_argument('--engine', choices=sorted(ENGINES), help='engine used when a request names none')
+    serve = commands.add_parser('serve', help='run the production server with preforked workers (needs gunicorn)')
+    serving.add_arguments(serve)
+    run = commands.add_parser('run', help='OCR files, directories or globs into a JSONL file with a process pool')
+    bulk.add_arguments(run)
+    bench = commands.add_parser('bench', help='benchmark the engines over an image corpus')
+    # Imported here: the benchmark is not part of the service
+    from benchmarks import ocr_bench
+    ocr_bench.add_arguments(bench)
+    args = parser.parse_args(argv)
+    
+    if args.command == 'serve':
+        serving.serve(app, ENGINES, args)
+    elif args.command == 'run':
+        sys.exit(bulk.run(args))
+    elif args.command == 'bench':
+        sys.exit(ocr_bench.run(args))
+    else:
+        run_server(getattr(args, 'engine', None))
+
+if __name__ == '__main__':
+    main()
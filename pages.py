@@ -0,0 +1,156 @@
+"""Page streams for multi-page uploads: multi-frame TIFF/GIF and PDF
+
+Pages are decoded one at a time as the OCR workers need them, so at most
+PAGES_IN_FLIGHT pages of a document are held decoded at once. PDFs are
+rasterised locally with pypdfium2, which is imported only when a PDF is
+uploaded. pdfium is not thread safe even across separate documents, and
+requests, jobs and streams decode on threads of their own, so every
+pypdfium2 call goes through _pdfium_lock.
+"""
+import contextvars
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+import metrics
+
+config = {
+    'PAGES_IN_FLIGHT': 2,  # pages decoded and being OCR'd at once, per document
+    'PAGE_WORKERS': 2,  # page OCR threads shared by all documents
+    'PDF_DPI': 300,  # rasterisation resolution for PDF pages
+    'MAX_PAGES': 500,  # pages past this are not OCR'd
+}
+
+PDF_MAGIC = b'%PDF-'
+
+_executor = None
+_executor_lock = threading.Lock()
+_pdfium_lock = threading.Lock()
+
+def is_pdf(stream):
+    stream.seek(0)
+    magic = stream.read(len(PDF_MAGIC))
+    stream.seek(0)
+    return magic == PDF_MAGIC
+
+def open_pdf(stream):
+    try:
+        import pypdfium2
+    except ImportError:
+        raise ValueError('PDF uploads need the pypdfium2 package (pip install pypdfium2)')
+    stream.seek(0)
+    with _pdfium_lock:
+        return pypdfium2.PdfDocument(stream)
+
+def close_pdf(pdf):
+    with _pdfium_lock:
+        pdf.close()
+
+def pdf_length(pdf):
+    with _pdfium_lock:
+        return len(pdf)
+
+def render_pdf_page(pdf, index):
+    """Render one PDF page to a PIL image at PDF_DPI"""
+    with _pdfium_lock:
+        page = pdf[index]
+        try:
+            bitmap = page.render(scale=config['PDF_DPI'] / 72)
+            try:
+                # BGR bitmaps are copied into the image, so the bitmap can be freed here
+                return bitmap.to_pil()
+            finally:
+                bitmap.close()
+        finally:
+            page.close()
+
+def is_document(stream):
+    """Whether an upload has several pages (or is a PDF) and should be OCR'd page by page"""
+    if is_pdf(stream):
+        return True
+    try:
+        with Image.open(stream) as image:
+            return getattr(image, 'n_frames', 1) > 1
+    except Exception:
+        # Let the engine report undecodable uploads
+        return False
+    finally:
+        stream.seek(0)
+
+def normalise_page(image):
+    # Palette, bilevel and 16-bit frames are converted so every engine sees L or RGB pixels
+    if image.mode in ('L', 'RGB'):
+        return image
+    return image.convert('RGB')
+
+def iter_pages(stream):
+    """Yield (page number, PIL image) for each page of a document, decoding lazily"""
+    if is_pdf(stream):
+        pdf = open_pdf(stream)
+        try:
+            for index in range(min(pdf_length(pdf), config['MAX_PAGES'])):
+                with metrics.stage('page_decode'):
+                    image = render_pdf_page(pdf, index)
+                yield index + 1, normalise_page(image)
+        finally:
+            close_pdf(pdf)
+        return
+    
+    stream.seek(0)
+    with Image.open(stream) as image:
+        for index in range(min(getattr(image, 'n_frames', 1), config['MAX_PAGES'])):
+            with metrics.stage('page_decode'):
+                image.seek(index)
+                # Copy the frame: seeking to the next one reuses the decoder's buffer
+                page = normalise_page(image.copy())
+            yield index + 1, page
+
+def page_count(stream):
+    """Number of pages in a document, before MAX_PAGES is applied"""
+    if is_pdf(stream):
+        pdf = open_pdf(stream)
+        try:
+            return pdf_length(pdf)
+        finally:
+            close_pdf(pdf)
+    stream.seek(0)
+    with Image.open(stream) as image:
+        count = getattr(image, 'n_frames', 1)
+    stream.seek(0)
+    return count
+
+def get_page_executor():
+    """Return the shared page worker pool, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, config['PAGE_WORKERS']), thread_name_prefix='ocr-page')
+        return _executor
+
+def iter_page_results(pages, fn, in_flight=None):
+    """Call fn(page number, image) for each page on the page pool, yielding (page number, result) in page order
+    
+    The next page is only decoded once fewer than in_flight pages are
+    waiting, so a long document never sits fully decoded in memory.
+    Decoding stays on the calling thread, one page at a time. Pages run
+    in a copy of the caller's context, so their stage timings count
+    towards the current request's (see metrics.py).
+    """
+    in_flight = max(1, in_flight or config['PAGES_IN_FLIGHT'])
+    executor = get_page_executor()
+    pending = deque()
+    try:
+        for number, image in pages:
+            pending.append((number, executor.submit(contextvars.copy_context().run, fn, number, image)))
+            del image
+            if len(pending) >= in_flight:
+                number, future = pending.popleft()
+                yield number, future.result()
+        while pending:
+            number, future = pending.popleft()
+            yield number, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
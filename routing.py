@@ -0,0 +1,126 @@
+"""Cheap image features used by the 'auto' engine to choose between Tesseract and EasyOCR
+
+Tesseract is far cheaper than EasyOCR and does well on clean, high contrast,
+straight scans. The features below are computed from the decoded image in a
+few milliseconds; when they look like a clean document the auto engine tries
+Tesseract first and only escalates to EasyOCR if Tesseract's confidence comes
+back low.
+"""
+import cv2
+import numpy as np
+
+config = {
+    'AUTO_FEATURE_MAX_SIDE': 1000,  # features are computed on a copy downscaled to this size
+    'AUTO_MIN_CONTRAST': 0.35,  # gap between mean ink and mean paper grey levels / 255
+    'AUTO_MAX_NOISE': 4.0,  # estimated noise sigma in grey levels at the image's own resolution, away from edges
+    'AUTO_MAX_SKEW': 5.0,  # degrees
+    'AUTO_MIN_REGIONS': 1,  # text line segments; clean A4 pages have about 40-110
+    'AUTO_MAX_REGIONS': 400,  # more segments than this usually means a photo or clutter
+    'AUTO_ESCALATE_CONFIDENCE': 60.0,  # Tesseract avg_confidence below this escalates to EasyOCR
+}
+
+# Immerkaer's noise estimation kernel: zero response to flat areas and linear ramps
+NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+# Sobel gradient magnitude of the blurred image above which a pixel is treated as a glyph edge
+NOISE_EDGE_GRADIENT = 30
+
+def estimate_noise(gray):
+    """Estimate the Gaussian noise sigma of a greyscale image (Immerkaer, 1996)
+    
+    Glyph edges respond to the kernel like noise, so on their own they put a
+    clean page of small print above any useful threshold. Pixels near edges
+    are left out; the edges are found on a blurred copy so that the noise
+    itself is not taken for edges.
+    """
+    height, width = gray.shape
+    if height < 3 or width < 3:
+        return 0.0
+    response = np.abs(cv2.filter2D(gray.astype(np.float32), -1, NOISE_KERNEL))
+    blurred = cv2.GaussianBlur(gray, (0, 0), 2)
+    gradient = cv2.magnitude(cv2.Sobel(blurred, cv2.CV_32F, 1, 0), cv2.Sobel(blurred, cv2.CV_32F, 0, 1))
+    flat = cv2.dilate((gradient > NOISE_EDGE_GRADIENT).astype(np.uint8), np.ones((5, 5), np.uint8)) == 0
+    flat[[0, -1], :] = flat[:, [0, -1]] = False
+    if flat.sum() < 0.05 * flat.size:
+        # Nearly all edges (a photo or texture): fall back to the whole image
+        flat[1:-1, 1:-1] = True
+    return float(np.sqrt(np.pi / 2) * response[flat].mean() / 6)
+
+def estimate_contrast(gray):
+    """Ink/paper separation: the gap between the means of the two Otsu classes, scaled to 0-1
+    
+    Unlike the grey level standard deviation this does not drop on sparse
+    pages that are mostly blank paper.
+    """
+    threshold, _ = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    dark = gray[gray <= threshold]
+    light = gray[gray > threshold]
+    if not dark.size or not light.size:
+        return 0.0
+    return float(light.mean() - dark.mean()) / 255
+
+def estimate_skew(gray):
+    """Estimate text skew in degrees from the minimum area rectangle around dark pixels"""
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    coords = cv2.findNonZero(binary)
+    if coords is None or len(coords) < 50:
+        return 0.0
+    angle = cv2.minAreaRect(coords)[-1]
+    # minAreaRect reports angles in [0, 90); fold to the nearest axis
+    if angle > 45:
+        angle -= 90
+    return float(angle)
+
+def count_text_lines(gray):
+    """Count text line segments: dark components merged along rows, ignoring specks
+    
+    Glyphs are joined with a horizontal dilation about one and a half
+    median component heights wide, which bridges letter and word gaps at
+    any text size but not the gaps between columns.
+    """
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    heights = heights[heights >= 2]
+    if not heights.size:
+        return 0
+    glyph_height = int(np.median(heights))
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, int(glyph_height * 1.5)), 1))
+    contours, _ = cv2.findContours(cv2.dilate(binary, kernel), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    boxes = (cv2.boundingRect(contour) for contour in contours)
+    return sum(1 for _, _, width, height in boxes if width >= 2 * glyph_height and height >= 2)
+
+def image_features(gray):
+    """Compute the routing features of a greyscale image, on a copy no larger than AUTO_FEATURE_MAX_SIDE
+    
+    Downscaling averages the noise away (by the scale factor for pixel
+    noise), so the noise measured on the copy is divided by it to keep the
+    score independent of the scan resolution.
+    """
+    height, width = gray.shape
+    scale = min(1.0, config['AUTO_FEATURE_MAX_SIDE'] / max(height, width))
+    small = cv2.resize(gray, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA) if scale < 1 else gray
+    
+    return {
+        'contrast': round(estimate_contrast(small), 4),
+        'noise': round(estimate_noise(small) / scale, 3),
+        'skew': round(estimate_skew(small), 2),
+        'regions': count_text_lines(small),
+    }
+
+def choose_engine(features):
+    """Return (engine name, reason) for the first engine to try"""
+    if features['contrast'] < config['AUTO_MIN_CONTRAST']:
+        return 'easyocr', 'low contrast'
+    if features['noise'] > config['AUTO_MAX_NOISE']:
+        return 'easyocr', 'noisy'
+    if abs(features['skew']) > config['AUTO_MAX_SKEW']:
+        return 'easyocr', 'skewed'
+    if not config['AUTO_MIN_REGIONS'] <= features['regions'] <= config['AUTO_MAX_REGIONS']:
+        return 'easyocr', 'unusual text region count'
+    return 'tesseract', 'clean document'
+
+def should_escalate(result):
+    """Whether a Tesseract result is weak enough to retry with EasyOCR"""
+    if not result['success'] or not result['text']:
+        return True
+    return result.get('avg_confidence', 0) < config['AUTO_ESCALATE_CONFIDENCE']
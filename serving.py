@@ -0,0 +1,152 @@
+"""Production serving for OCRify: preforked gunicorn workers sharing preloaded models
+
+`python -m ocrify serve` runs the app under gunicorn instead of Flask's
+development server. The app is imported and the engines in SERVE_PRELOAD
+load their models in the master process before it forks, so every worker
+shares the EasyOCR/torch weights copy-on-write instead of loading its own
+copy. Each worker caps torch, OpenCV and OpenMP at SERVE_COMPUTE_THREADS
+threads so workers don't oversubscribe the CPUs, and is recycled gracefully
+after SERVE_MAX_REQUESTS requests to bound memory growth.
+
+gunicorn is imported only by serve(); the development server doesn't need it.
+"""
+import logging
+import os
+import sys
+
+import cv2
+
+import Tesseract
+
+config = {
+    'SERVE_HOST': '0.0.0.0',
+    'SERVE_PORT': 5000,
+    'SERVE_WORKERS': 2,  # worker processes
+    'SERVE_THREADS': 4,  # request threads per worker
+    'SERVE_COMPUTE_THREADS': None,  # torch/OpenCV/OpenMP threads per worker; None splits the CPUs between workers
+    'SERVE_MAX_REQUESTS': 1000,  # a worker is replaced after this many requests; 0 never recycles
+    'SERVE_MAX_REQUESTS_JITTER': 100,  # random extra requests so workers don't all recycle at once
+    'SERVE_TIMEOUT': 300,  # seconds a worker may spend on one request before it is killed
+    'SERVE_PRELOAD': ['easyocr'],  # engines whose models are loaded before forking
+}
+
+# Read by OpenMP, MKL and OpenBLAS when they initialise, including libtesseract's OpenMP
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OMP_THREAD_LIMIT', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+logger = logging.getLogger(__name__)
+
+def add_arguments(parser):
+    """Add the serve subcommand's options, defaulting to config"""
+    parser.add_argument('--host', default=config['SERVE_HOST'])
+    parser.add_argument('--port', type=int, default=config['SERVE_PORT'])
+    parser.add_argument('--engine', help='engine used when a request names none')
+    parser.add_argument('--workers', type=int, default=config['SERVE_WORKERS'], help='worker processes')
+    parser.add_argument('--threads', type=int, default=config['SERVE_THREADS'], help='request threads per worker')
+    parser.add_argument('--compute-threads', type=int, default=config['SERVE_COMPUTE_THREADS'],
+                        help='torch/OpenCV/OpenMP threads per worker (default: CPUs / workers)')
+    parser.add_argument('--max-requests', type=int, default=config['SERVE_MAX_REQUESTS'],
+                        help='recycle a worker after this many requests (0 never recycles)')
+    parser.add_argument('--max-requests-jitter', type=int, default=config['SERVE_MAX_REQUESTS_JITTER'])
+    parser.add_argument('--timeout', type=int, default=config['SERVE_TIMEOUT'])
+    parser.add_argument('--preload', default=','.join(config['SERVE_PRELOAD']),
+                        help="comma separated engines to load before forking ('' loads nothing)")
+
+def compute_threads(workers, requested=None):
+    return max(1, requested or (os.cpu_count() or 1) // max(1, workers))
+
+def limit_threads(threads):
+    """Cap the thread pools of the numeric libraries in this process
+    
+    The environment variables only reach runtimes that initialise later
+    (libtesseract's OpenMP, torch when it is first imported); OpenCV and an
+    already imported torch are set directly.
+    """
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    cv2.setNumThreads(threads)
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+def uses_gpu(engines, names):
+    """Whether preloading these engines would initialise CUDA, which doesn't survive a fork"""
+    if 'easyocr' not in names or 'easyocr' not in engines:
+        return False
+    import EasyOCR
+    
+    # With EASYOCR_DEVICE 'auto' the pool asks torch.cuda.is_available(), which
+    # initialises CUDA in this process unless torch is told to ask NVML instead
+    os.environ.setdefault('PYTORCH_NVML_BASED_CUDA_CHECK', '1')
+    EasyOCR.get_reader_pool()
+    return EasyOCR.READER_INFO.get('device') == 'gpu'
+
+def preload(engines, names):
+    """Load the named engines' models in the master process, returning the names loaded"""
+    unknown = [name for name in names if name not in engines]
+    if unknown:
+        raise ValueError(f"Unknown engines to preload: {', '.join(unknown)}")
+    if uses_gpu(engines, names):
+        logger.warning('EasyOCR runs on the GPU; loading its models in each worker instead of before forking')
+        names = [name for name in names if name != 'easyocr']
+    
+    # One compute thread while warming up: an OpenMP pool started in the
+    # master would be inherited by the workers without its threads
+    limit_threads(1)
+    for name in names:
+        engines[name].warmup(force=True)
+    return names
+
+def serve(app, engines, options):
+    """Run app under gunicorn with the options from add_arguments"""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit('The serve command needs gunicorn (pip install gunicorn)')
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    if options.engine:
+        if options.engine not in engines:
+            raise SystemExit(f'Unknown engine: {options.engine}')
+        app.config['DEFAULT_ENGINE'] = options.engine
+    
+    names = [name.strip() for name in options.preload.split(',') if name.strip()]
+    threads = compute_threads(options.workers, options.compute_threads)
+    try:
+        preloaded = preload(engines, names)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    
+    def post_fork(server, worker):
+        limit_threads(threads)
+        # Strategy passes, like the compute libraries, get only this worker's share of the CPUs
+        Tesseract.config['OCR_MAX_WORKERS'] = threads
+        # Engines that were not preloaded (GPU readers) warm up in each worker
+        for name in names:
+            if name not in preloaded:
+                engines[name].warmup(force=True)
+        server.log.info('Worker %s: %s compute threads', worker.pid, threads)
+    
+    settings = {
+        'bind': f'{options.host}:{options.port}',
+        'workers': options.workers,
+        'worker_class': 'gthread',
+        'threads': options.threads,
+        'max_requests': options.max_requests,
+        'max_requests_jitter': options.max_requests_jitter,
+        'timeout': options.timeout,
+        'graceful_timeout': options.timeout,
+        'preload_app': True,
+        'post_fork': post_fork,
+    }
+    
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in settings.items():
+                self.cfg.set(key, value)
+        
+        def load(self):
+            return app
+    
+    logger.info('Serving on %s with %s workers x %s threads (preloaded: %s)',
+                settings['bind'], options.workers, options.threads, ', '.join(preloaded) or 'nothing')
+    Server().run()
@@ -0,0 +1,146 @@
+"""Which Tesseract strategies win, per document class, and pruning the ones that don't
+
+A STATS_SAMPLE_RATE share of the extract_text calls that run the full
+strategy plan record, for the image's document class, each strategy's run
+time and which strategy's text was kept, along with how many characters
+the winner added over the runner-up. Sampling keeps the classification
+pass off most requests in the default 'all' mode. In 'pruned' mode
+extract_text classifies every image and drops the strategies whose win
+rate for its class is below PRUNE_MIN_WIN_RATE once that class has
+PRUNE_MIN_SAMPLES recorded images. A PRUNE_EXPLORE_RATE share of pruned
+requests still runs (and records) every strategy, so the statistics keep
+up with the traffic.
+
+Statistics are kept in memory; set STATS_PATH to also accumulate them in
+SQLite, where several processes can add to the same counts.
+"""
+import random
+import sqlite3
+import threading
+
+import routing
+
+config = {
+    'STATS_ENABLED': True,  # record sampled full-plan runs
+    'STATS_SAMPLE_RATE': 0.1,  # share of full-plan runs classified and recorded (one downscaled feature pass each)
+    'STATS_PATH': None,  # e.g. 'strategy_stats.sqlite3' to keep statistics across restarts
+    'STATS_SPARSE_REGIONS': 15,  # fewer text line segments than this makes an image 'sparse'
+    'PRUNE_MIN_SAMPLES': 100,  # images of a class recorded before its plan is pruned
+    'PRUNE_MIN_WIN_RATE': 0.02,  # strategies winning less often than this are dropped
+    'PRUNE_EXPLORE_RATE': 0.05,  # share of pruned requests that still run every strategy
+}
+
+FIELDS = ('runs', 'wins', 'seconds', 'added_chars')
+
+_stats = None
+_stats_lock = threading.Lock()
+
+def document_class(gray):
+    """Bucket a greyscale page by the auto engine's routing features
+    
+    Returns one of 'low_contrast', 'noisy', 'skewed', 'cluttered', 'sparse'
+    or 'document'.
+    """
+    features = routing.image_features(gray)
+    if features['contrast'] < routing.config['AUTO_MIN_CONTRAST']:
+        return 'low_contrast'
+    if features['noise'] > routing.config['AUTO_MAX_NOISE']:
+        return 'noisy'
+    if abs(features['skew']) > routing.config['AUTO_MAX_SKEW']:
+        return 'skewed'
+    if features['regions'] > routing.config['AUTO_MAX_REGIONS']:
+        return 'cluttered'
+    if features['regions'] < config['STATS_SPARSE_REGIONS']:
+        return 'sparse'
+    return 'document'
+
+def sampled():
+    """Whether to classify and record this full-plan run"""
+    return random.random() < config['STATS_SAMPLE_RATE']
+
+class StrategyStats:
+    """Per (document class, strategy) runs, wins, total seconds and characters added over the runner-up"""
+    
+    def __init__(self, db_path=None):
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS strategy_stats (doc_class TEXT NOT NULL, strategy TEXT NOT NULL, '
+                'runs INTEGER NOT NULL, wins INTEGER NOT NULL, seconds REAL NOT NULL, added_chars INTEGER NOT NULL, '
+                'PRIMARY KEY (doc_class, strategy))'
+            )
+            self._db.commit()
+            for doc_class, strategy, *values in self._db.execute(f"SELECT doc_class, strategy, {', '.join(FIELDS)} FROM strategy_stats"):
+                self._counts[doc_class, strategy] = dict(zip(FIELDS, values))
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls(db_path=config['STATS_PATH'])
+    
+    def record(self, doc_class, outcomes, winner):
+        """Record one full-plan run: outcomes are (strategy, text length, seconds) and winner the kept strategy"""
+        lengths = {name: chars for name, chars, _ in outcomes}
+        runner_up = max((chars for name, chars in lengths.items() if name != winner), default=0)
+        updates = [
+            (name, {'runs': 1, 'wins': int(name == winner), 'seconds': seconds,
+                    'added_chars': max(0, lengths[winner] - runner_up) if name == winner else 0})
+            for name, _, seconds in outcomes
+        ]
+        with self._lock:
+            for name, update in updates:
+                counts = self._counts.setdefault((doc_class, name), dict.fromkeys(FIELDS, 0))
+                for field, value in update.items():
+                    counts[field] += value
+            if self._db is not None:
+                self._db.executemany(
+                    'INSERT INTO strategy_stats (doc_class, strategy, runs, wins, seconds, added_chars) VALUES (?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (doc_class, strategy) DO UPDATE SET runs = runs + excluded.runs, wins = wins + excluded.wins, '
+                    'seconds = seconds + excluded.seconds, added_chars = added_chars + excluded.added_chars',
+                    [(doc_class, name, *(update[field] for field in FIELDS)) for name, update in updates]
+                )
+                self._db.commit()
+    
+    def prune(self, doc_class, names):
+        """Return (names to run, names dropped) for an image of doc_class"""
+        with self._lock:
+            wins = {name: self._counts.get((doc_class, name), {}).get('wins', 0) for name in names}
+            images = sum(counts['wins'] for (cls, _), counts in self._counts.items() if cls == doc_class)
+        # A class with nothing recorded has no win rates, whatever PRUNE_MIN_SAMPLES says
+        if not images or images < config['PRUNE_MIN_SAMPLES'] or random.random() < config['PRUNE_EXPLORE_RATE']:
+            return list(names), []
+        
+        keep = [name for name in names if wins[name] / images >= config['PRUNE_MIN_WIN_RATE']]
+        if not keep:
+            keep = [max(names, key=wins.get)]
+        return keep, [name for name in names if name not in keep]
+    
+    def report(self):
+        """Win rate, mean characters added when winning and mean cost of each strategy, per document class"""
+        with self._lock:
+            counts = {key: dict(value) for key, value in self._counts.items()}
+        
+        report = {}
+        for (doc_class, name), value in sorted(counts.items()):
+            entry = report.setdefault(doc_class, {'images': 0, 'strategies': {}})
+            entry['images'] += value['wins']
+            entry['strategies'][name] = value
+        for entry in report.values():
+            for value in entry['strategies'].values():
+                value['win_rate'] = round(value['wins'] / entry['images'], 4) if entry['images'] else 0
+                value['mean_added_chars'] = round(value['added_chars'] / value['wins'], 1) if value['wins'] else 0
+                value['mean_seconds'] = round(value['seconds'] / value['runs'], 4) if value['runs'] else 0
+                value['seconds'] = round(value['seconds'], 3)
+        return report
+
+def get_stats():
+    """Return the process-wide strategy statistics, or None when recording is disabled"""
+    global _stats
+    if not config['STATS_ENABLED']:
+        return None
+    with _stats_lock:
+        if _stats is None:
+            _stats = StrategyStats.from_config(config)
+        return _stats
@@ -0,0 +1,183 @@
+"""In-process Tesseract backend using libtesseract's C API through ctypes
+
+pytesseract starts a tesseract process per call, which reloads the
+traineddata and round-trips the image through a temporary PNG. This module
+keeps initialised TessBaseAPI handles alive instead, one set per thread, and
+hands numpy pixel buffers straight to TessBaseAPISetImage without copying.
+No Python package is needed beyond numpy; only the libtesseract shared
+library (installed with tesseract on most systems) has to be loadable.
+"""
+import ctypes
+import ctypes.util
+import shlex
+import threading
+
+import numpy as np
+from PIL import Image
+
+# Header of tesseract's TSV renderer; TessBaseAPIGetTsvText returns only the rows
+TSV_HEADER = 'level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext\n'
+DEFAULT_LANGUAGE = 'eng'
+DEFAULT_OEM = 3  # OEM_DEFAULT
+DEFAULT_PSM = 3  # PSM_AUTO, as the tesseract command line
+
+_library = None
+_library_error = None
+_library_lock = threading.Lock()
+_local = threading.local()
+
+class UnsupportedConfig(ValueError):
+    """Raised for tesseract command line options the C API backend does not translate"""
+
+def load_library(path=None):
+    """Load libtesseract once per process, raising OSError if it is unavailable"""
+    global _library, _library_error
+    with _library_lock:
+        if _library is not None:
+            return _library
+        if _library_error is not None:
+            raise _library_error
+        try:
+            name = path or ctypes.util.find_library('tesseract')
+            if name is None:
+                raise OSError('libtesseract not found')
+            lib = ctypes.CDLL(name)
+            _declare(lib)
+        except (OSError, AttributeError) as e:
+            _library_error = OSError(f'Cannot load libtesseract: {e}')
+            raise _library_error
+        _library = lib
+        return lib
+
+def _declare(lib):
+    handle = ctypes.c_void_p
+    lib.TessVersion.restype = ctypes.c_char_p
+    lib.TessBaseAPICreate.restype = handle
+    lib.TessBaseAPIInit2.argtypes = [handle, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+    lib.TessBaseAPIInit2.restype = ctypes.c_int
+    lib.TessBaseAPISetVariable.argtypes = [handle, ctypes.c_char_p, ctypes.c_char_p]
+    lib.TessBaseAPISetVariable.restype = ctypes.c_int
+    lib.TessBaseAPISetPageSegMode.argtypes = [handle, ctypes.c_int]
+    lib.TessBaseAPISetImage.argtypes = [handle, ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+    lib.TessBaseAPISetSourceResolution.argtypes = [handle, ctypes.c_int]
+    lib.TessBaseAPIRecognize.argtypes = [handle, ctypes.c_void_p]
+    lib.TessBaseAPIRecognize.restype = ctypes.c_int
+    # Returned strings are owned by the caller and released with TessDeleteText
+    lib.TessBaseAPIGetUTF8Text.argtypes = [handle]
+    lib.TessBaseAPIGetUTF8Text.restype = ctypes.c_void_p
+    lib.TessBaseAPIGetTsvText.argtypes = [handle, ctypes.c_int]
+    lib.TessBaseAPIGetTsvText.restype = ctypes.c_void_p
+    lib.TessDeleteText.argtypes = [ctypes.c_void_p]
+    for name in ('TessBaseAPIClear', 'TessBaseAPIEnd', 'TessBaseAPIDelete'):
+        getattr(lib, name).argtypes = [handle]
+
+def version():
+    return load_library().TessVersion().decode()
+
+def parse_config(tesseract_config):
+    """Translate a tesseract command line config into (language, oem, psm, dpi, variables)"""
+    language, oem, psm, dpi, variables = DEFAULT_LANGUAGE, DEFAULT_OEM, DEFAULT_PSM, None, {}
+    args = shlex.split(tesseract_config)
+    while args:
+        option = args.pop(0)
+        if option in ('-l', '--oem', '--psm', '--dpi', '-c') and not args:
+            raise UnsupportedConfig(f'Missing value for {option}')
+        if option == '-l':
+            language = args.pop(0)
+        elif option == '--oem':
+            oem = int(args.pop(0))
+        elif option == '--psm':
+            psm = int(args.pop(0))
+        elif option == '--dpi':
+            dpi = int(args.pop(0))
+        elif option == '-c':
+            name, _, value = args.pop(0).partition('=')
+            variables[name] = value
+        else:
+            raise UnsupportedConfig(f'Unsupported tesseract option: {option}')
+    return language, oem, psm, dpi, tuple(sorted(variables.items()))
+
+class TessBaseAPI:
+    """One initialised TessBaseAPI handle; not thread safe, so each thread owns its own"""
+    
+    def __init__(self, lib, language, oem, variables):
+        self._lib = lib
+        self._handle = lib.TessBaseAPICreate()
+        if lib.TessBaseAPIInit2(self._handle, None, language.encode(), oem) != 0:
+            lib.TessBaseAPIDelete(self._handle)
+            self._handle = None
+            raise RuntimeError(f'Failed to initialise tesseract for language {language!r}')
+        for name, value in variables:
+            if not lib.TessBaseAPISetVariable(self._handle, name.encode(), value.encode()):
+                raise UnsupportedConfig(f'Unknown tesseract variable: {name}')
+    
+    def recognize(self, pixels, psm, dpi=None):
+        """OCR a uint8 array from as_pixels (H x W, H x W x 3 or H x W x 4); returns (text, tsv)"""
+        lib, handle = self._lib, self._handle
+        height, width = pixels.shape[:2]
+        bytes_per_pixel = 1 if pixels.ndim == 2 else pixels.shape[2]
+        lib.TessBaseAPISetPageSegMode(handle, psm)
+        # Tesseract reads the numpy buffer in place; pixels stays referenced until Recognize returns
+        lib.TessBaseAPISetImage(handle, pixels.ctypes.data, width, height, bytes_per_pixel, pixels.strides[0])
+        if dpi:
+            lib.TessBaseAPISetSourceResolution(handle, dpi)
+        try:
+            if lib.TessBaseAPIRecognize(handle, None) != 0:
+                raise RuntimeError('Tesseract recognition failed')
+            text = self._take_text(lib.TessBaseAPIGetUTF8Text(handle))
+            tsv = self._take_text(lib.TessBaseAPIGetTsvText(handle, 0))
+        finally:
+            lib.TessBaseAPIClear(handle)
+        return text, TSV_HEADER + tsv
+    
+    def _take_text(self, pointer):
+        if not pointer:
+            return ''
+        try:
+            return ctypes.string_at(pointer).decode('utf-8')
+        finally:
+            self._lib.TessDeleteText(pointer)
+    
+    def __del__(self):
+        if getattr(self, '_handle', None):
+            self._lib.TessBaseAPIEnd(self._handle)
+            self._lib.TessBaseAPIDelete(self._handle)
+            self._handle = None
+
+def get_api(language, oem, variables):
+    """Return this thread's handle for the given init settings, creating it on first use"""
+    apis = getattr(_local, 'apis', None)
+    if apis is None:
+        apis = _local.apis = {}
+    key = (language, oem, variables)
+    api = apis.get(key)
+    if api is None:
+        api = apis[key] = TessBaseAPI(load_library(), language, oem, variables)
+    return api
+
+def as_pixels(image):
+    """Return a uint8 pixel array Tesseract can read in place, copying only when needed
+    
+    Row-strided views such as crops of a larger image are passed as they are;
+    only arrays whose pixels are not packed within a row are copied.
+    """
+    if isinstance(image, Image.Image):
+        if 'A' in image.getbands():
+            # Flatten transparency onto white, as pytesseract does before calling tesseract
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, (0, 0), image)
+            image = background
+        elif image.mode not in ('L', 'RGB'):
+            image = image.convert('RGB')
+        image = np.asarray(image)
+    if image.dtype != np.uint8 or image.ndim not in (2, 3) or (image.ndim == 3 and image.shape[2] not in (3, 4)):
+        raise UnsupportedConfig(f'Unsupported image array: {image.dtype} {image.shape}')
+    packed_row = image.strides[-1] == 1 and (image.ndim == 2 or image.strides[1] == image.shape[2])
+    if not packed_row or image.strides[0] < image.shape[1] * image.strides[1]:
+        image = np.ascontiguousarray(image)
+    return image
+
+def image_to_text_and_tsv(image, tesseract_config=''):
+    """OCR an image in-process, returning the same text and TSV the tesseract command line writes"""
+    language, oem, psm, dpi, variables = parse_config(tesseract_config)
+    return get_api(language, oem, variables).recognize(as_pixels(image), psm, dpi)
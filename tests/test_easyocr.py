@@ -0,0 +1,41 @@
+import sys
+import threading
+import time
+import types
+
+import EasyOCR
+
+class Model:
+    def parameters(self):
+        return []
+
+class Reader:
+    """Stands in for easyocr.Reader, recording which readers loaded a detector"""
+    
+    detectors = []
+    
+    def __init__(self, languages, gpu, verbose, detector=True):
+        self.recognizer = Model()
+        if detector:
+            self.detectors.append(languages)
+            time.sleep(0.2)
+            self.detector = Model()
+            self.get_textbox = self.get_detector = self.detect_network = None
+
+def test_concurrent_first_readers_load_one_detector(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'easyocr', types.SimpleNamespace(Reader=Reader))
+    pool = EasyOCR.ReaderPool(gpu=False)
+    readers = {}
+    
+    def lease(languages):
+        with pool.lease(languages) as reader:
+            readers[languages[0]] = reader
+    
+    threads = [threading.Thread(target=lease, args=([language],)) for language in ('en', 'fr')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(Reader.detectors) == 1
+    assert readers['en'].detector is readers['fr'].detector
@@ -0,0 +1,96 @@
+import io
+import json
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+
+import metrics
+import ocr_cache
+import strategy_stats
+import Tesseract
+from ocrify import app
+
+def tesseract_available():
+    try:
+        return Tesseract.active_backend() == 'capi' or shutil.which(Tesseract.pytesseract.pytesseract.tesseract_cmd) is not None
+    except (OSError, ValueError):
+        return False
+
+needs_tesseract = pytest.mark.skipif(not tesseract_available(), reason='needs libtesseract or the tesseract binary')
+
+def png(width=800, height=600, lines=8):
+    page = np.full((height, width), 255, np.uint8)
+    for i in range(lines):
+        cv2.putText(page, 'Hello world line', (40, 60 + i * 60), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 2)
+    return cv2.imencode('.png', page)[1].tobytes()
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = strategy_stats.StrategyStats()
+    monkeypatch.setattr(strategy_stats, '_stats', stats)
+    monkeypatch.setitem(strategy_stats.config, 'STATS_ENABLED', True)
+    monkeypatch.setitem(strategy_stats.config, 'PRUNE_EXPLORE_RATE', 0)
+    return stats
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(ocr_cache.config, 'OCR_CACHE_ENABLED', False)
+    return app.test_client()
+
+def upload(client, data, **form):
+    return client.post('/upload', data={'file': (io.BytesIO(data), 'page.png'), **form})
+
+@needs_tesseract
+def test_pruned_mode_reports_class_and_pruned_strategies(client, stats):
+    image = png()
+    doc_class = strategy_stats.document_class(cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_GRAYSCALE))
+    names = [name for name, _, _ in Tesseract.TESSERACT_STRATEGIES]
+    for _ in range(strategy_stats.config['PRUNE_MIN_SAMPLES']):
+        stats.record(doc_class, [(name, 10, 0.1) for name in names], 'otsu_psm6')
+    
+    body = upload(client, image, mode='pruned').get_json()
+    assert body['success']
+    assert body['document_class'] == doc_class
+    assert body['pruned'] == [name for name in names if name != 'otsu_psm6']
+    assert body['strategies_run'] == 1
+    assert body['method_used'] == 'otsu_psm6'
+
+@needs_tesseract
+def test_pruned_mode_without_statistics_runs_every_strategy(client, stats):
+    body = upload(client, png(), mode='pruned').get_json()
+    assert body['success']
+    assert 'document_class' in body
+    assert body['pruned'] == []
+
+@needs_tesseract
+def test_tall_image_reports_tiles(client, monkeypatch):
+    monkeypatch.setitem(Tesseract.config, 'OCR_TILE_MIN_HEIGHT', 2000)
+    monkeypatch.setitem(Tesseract.config, 'OCR_TILE_HEIGHT', 800)
+    body = upload(client, png(height=2400, lines=38), mode='cascade').get_json()
+    assert body['success']
+    assert body['tiles'] == 3
+    assert body['text'].count('Hello') >= 30
+
+def test_status_reports_an_invalid_backend(client, monkeypatch):
+    monkeypatch.setitem(Tesseract.config, 'OCR_BACKEND', 'tesserocr')
+    response = client.get('/status')
+    assert response.status_code == 200
+    assert response.get_json()['engines']['tesseract']['backend_error'] == 'Invalid OCR_BACKEND: tesserocr'
+
+@needs_tesseract
+def test_streamed_upload_is_counted_when_the_stream_ends(client):
+    def value(name, **labels):
+        return metrics._values.get(metrics._key(name, {'endpoint': '/upload/stream', **labels}), 0)
+    
+    finished = value('ocr_requests_total', status=200)
+    response = client.post('/upload/stream', data={'file': (io.BytesIO(png()), 'page.png')}, buffered=False)
+    assert value('ocr_requests_in_flight') == 1
+    assert value('ocr_requests_total', status=200) == finished
+    
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    response.close()
+    assert events[-1]['event'] == 'result' and events[-1]['success']
+    assert value('ocr_requests_in_flight') == 0
+    assert value('ocr_requests_total', status=200) == finished + 1
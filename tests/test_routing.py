@@ -0,0 +1,37 @@
+import cv2
+import numpy as np
+import pytest
+
+import routing
+
+def text_page(width=620, height=877):
+    """A clean synthetic page of dark text lines on white paper"""
+    page = np.full((height, width), 255, np.uint8)
+    for y in range(90, height - 90, 24):
+        cv2.putText(page, 'the quick brown fox jumps over', (60, y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, 20, 1, cv2.LINE_AA)
+    return page
+
+def add_noise(gray, sigma):
+    noise = np.random.default_rng(0).normal(0, sigma, gray.shape)
+    return np.clip(gray + noise, 0, 255).astype(np.uint8)
+
+def upscale(gray, factor):
+    return cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_CUBIC)
+
+def is_noisy(gray):
+    return routing.image_features(gray)['noise'] > routing.config['AUTO_MAX_NOISE']
+
+@pytest.mark.parametrize('factor', [2, 4])
+@pytest.mark.parametrize('sigma', [0, 25])
+def test_noise_verdict_survives_upscaling(sigma, factor):
+    page = add_noise(text_page(), sigma)
+    assert is_noisy(upscale(page, factor)) == is_noisy(page) == bool(sigma)
+
+def test_noise_is_scored_at_native_resolution():
+    # The same sigma on a small page and a full A4 page at 300dpi
+    small = routing.image_features(add_noise(text_page(), 25))['noise']
+    large = routing.image_features(add_noise(text_page(2480, 3508), 25))['noise']
+    assert large == pytest.approx(small, rel=0.25)
+
+def test_clean_page_goes_to_tesseract():
+    assert routing.choose_engine(routing.image_features(text_page()))[0] == 'tesseract'
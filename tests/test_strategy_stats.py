@@ -0,0 +1,25 @@
+import pytest
+
+import strategy_stats
+
+NAMES = ['adaptive_psm3', 'otsu_psm6', 'simple_psm4']
+
+@pytest.fixture(autouse=True)
+def no_exploring(monkeypatch):
+    monkeypatch.setitem(strategy_stats.config, 'PRUNE_EXPLORE_RATE', 0)
+
+def test_prune_keeps_every_strategy_below_min_samples():
+    stats = strategy_stats.StrategyStats()
+    stats.record('document', [(name, 10, 0.1) for name in NAMES], 'otsu_psm6')
+    assert stats.prune('document', NAMES) == (NAMES, [])
+
+def test_prune_drops_strategies_that_never_win(monkeypatch):
+    monkeypatch.setitem(strategy_stats.config, 'PRUNE_MIN_SAMPLES', 10)
+    stats = strategy_stats.StrategyStats()
+    for _ in range(10):
+        stats.record('document', [(name, 10, 0.1) for name in NAMES], 'otsu_psm6')
+    assert stats.prune('document', NAMES) == (['otsu_psm6'], ['adaptive_psm3', 'simple_psm4'])
+
+def test_prune_without_samples_and_no_minimum(monkeypatch):
+    monkeypatch.setitem(strategy_stats.config, 'PRUNE_MIN_SAMPLES', 0)
+    assert strategy_stats.StrategyStats().prune('document', NAMES) == (NAMES, [])